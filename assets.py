@@ -0,0 +1,188 @@
+# Images and sounds of the game. 'python assets.py' bakes them into a single asset pack of pre-scaled pixels, the
+# explosion sprite sheets and pre-decoded PCM, which the game memory-maps at startup instead of decoding and scaling
+# every file. The pack records the size and modification time of every source file, so an asset whose source changed
+# since the pack was built is loaded from its source file instead
+from pygame.image     import load, frombuffer, tobytes
+from pygame.transform import scale
+from pygame.mixer     import Sound, get_init, init as mixer_init
+from pygame           import Surface, SRCALPHA, Rect, AUDIO_ALLOW_FREQUENCY_CHANGE
+
+from json import dumps, loads
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+from struct import Struct
+
+PACK_PATH      = "lib/assets.pack"
+MAGIC, VERSION = b"MTAP", 3   # Version 3: the explosion frames are packed as one sprite sheet per size
+HEADER         = Struct("<4sIII")   # magic, version, length of the JSON index that follows, start of the assets
+ALIGNMENT      = 64                 # Every asset starts at a multiple of this in the pack
+
+MIXER_SETTINGS = dict(frequency=44100, size=32, channels=4, buffer=512, allowedchanges=AUDIO_ALLOW_FREQUENCY_CHANGE)
+
+# Stored in the byte order of the usual 32-bit display format, so converting the pixels is a plain copy
+PIXEL_FORMAT = "BGRA"
+
+EXPLOSION_FRAMES  = 27
+EXPLOSION_SOURCES = [f"lib/images/explosion/frame_{frame}.png" for frame in range(1, EXPLOSION_FRAMES + 1)]
+
+# Every size an explosion is drawn at: the spaceship's and the meteorites', which start at 140 and split in halves
+EXPLOSION_SIZES = (200, 140, 70, 35)
+
+IMAGES = {
+    # name: (source file, size to scale to, has transparency)
+    "icon":       ("lib/images/meteorite.png", None, False),
+    "background": ("lib/images/background.jpg", (800, 800), False),
+    "heart":      ("lib/images/heart.png", (40, 40), True),
+    "trophy":     ("lib/images/trophy.png", (17, 22), True),
+}
+
+SOUNDS = {
+    "shoot":               "lib/sfx/shoot.wav",
+    "explosion":           "lib/sfx/explosion.mp3",
+    "meteorite_explosion": "lib/sfx/meteorite_explosion.wav",
+    "game_over":           "lib/sfx/gameover.mp3",
+}
+
+
+def source_stamps(paths):
+    # [path, size, modification time] of every source file an asset is made from, lists like in the JSON index
+    return [[path, stat.st_size, stat.st_mtime_ns] for path, stat in ((path, Path(path).stat()) for path in paths)]
+
+
+def load_image(name: str):
+    source, size, _ = IMAGES[name]
+    image = load(source)   # -> pygame.image.load()
+    return scale(image, size) if size else image   # -> pygame.transform.scale()
+
+
+def load_explosion_sheet(size: int):
+    # The explosion frames scaled to 'size', packed left to right into one Surface
+    sheet = Surface((size * EXPLOSION_FRAMES, size), SRCALPHA)   # -> pygame.Surface()
+    for frame, source in enumerate(EXPLOSION_SOURCES):
+        sheet.blit(scale(load(source), (size, size)), (frame * size, 0))   # -> pygame.transform.scale()
+    return sheet
+
+
+class Assets:
+    # Loads every asset lazily on its first use and keeps it. The assets come from the memory-mapped pack when
+    # there is one, and from the source files otherwise, or always with 'pack_path=None'. The display has to be
+    # set before loading images, since they are converted to its pixel format
+    def __init__(self, pack_path=PACK_PATH):
+        self.images, self.sounds, self.sheets = {}, {}, {}
+        self.index, self.data                = {}, None
+
+        if pack_path is not None and Path(pack_path).is_file():
+            with open(pack_path, "rb") as pack_file:
+                self.pack = mmap(pack_file.fileno(), 0, access=ACCESS_READ)
+
+            magic, version, index_length, start = HEADER.unpack_from(self.pack)
+            if magic == MAGIC and version == VERSION:
+                self.index = loads(self.pack[HEADER.size:HEADER.size + index_length])
+                self.data  = memoryview(self.pack)[start:]
+
+    @property
+    def packed(self):
+        return self.data is not None
+
+    def packed_entry(self, name: str):
+        # The asset's entry in the pack, None if it isn't packed or any of its source files changed since
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+
+        sources = entry["sources"]
+        try:
+            if source_stamps(path for path, *_ in sources) != sources:
+                return None
+        except OSError:
+            pass   # The sources aren't shipped along, so the pack is all there is
+        return entry
+
+    def image(self, name: str):
+        image = self.images.get(name)
+        if image is not None:
+            return image
+
+        entry = self.packed_entry(name)
+        if entry is not None:
+            pixels = self.data[entry["offset"]:entry["offset"] + entry["length"]]
+            image  = frombuffer(pixels, entry["size"], PIXEL_FORMAT)   # -> pygame.image.frombuffer()
+        else:
+            image = load_image(name)
+
+        image = self.images[name] = image.convert_alpha() if IMAGES[name][2] else image.convert()
+        return image
+
+    def explosion_sheet(self, size: int):
+        # (Surface, [area of every frame]) of the explosion at 'size'. The sheets of EXPLOSION_SIZES come from the
+        # pack, any other size is built from the frames on its first use. Every renderer drawing with the same
+        # Assets shares its sheets
+        sheet = self.sheets.get(size)
+        if sheet is not None:
+            return sheet
+
+        entry = self.packed_entry(f"explosion_{size}")
+        if entry is not None:
+            pixels  = self.data[entry["offset"]:entry["offset"] + entry["length"]]
+            surface = frombuffer(pixels, entry["size"], PIXEL_FORMAT)   # -> pygame.image.frombuffer()
+        else:
+            surface = load_explosion_sheet(size)
+
+        areas = [Rect(frame * size, 0, size, size) for frame in range(EXPLOSION_FRAMES)]
+        sheet = self.sheets[size] = (surface.convert_alpha(), areas)
+        return sheet
+
+    def sound(self, name: str):
+        sound = self.sounds.get(name)
+        if sound is not None:
+            return sound
+
+        # The PCM can only be used if the mixer runs in the same format it was decoded to
+        entry = self.packed_entry(name)
+        if entry is not None and tuple(entry["mixer"]) == get_init():
+            sound = Sound(buffer=self.data[entry["offset"]:entry["offset"] + entry["length"]])
+        else:
+            sound = Sound(SOUNDS[name])   # -> pygame.mixer.Sound()
+
+        self.sounds[name] = sound
+        return sound
+
+
+def build(pack_path=PACK_PATH):
+    # The sounds are decoded to the format of the mixer, so it has to be initialized like in the game
+    index, blobs, offset = {}, [], 0
+
+    def add(name: str, data: bytes, sources: list, **entry):
+        nonlocal offset
+        padding = -offset % ALIGNMENT
+        blobs.append(b"\0" * padding + data)
+        index[name] = {"offset": offset + padding, "length": len(data), "sources": source_stamps(sources), **entry}
+        offset += padding + len(data)
+
+    for name, (source, *_) in IMAGES.items():
+        image = load_image(name)
+        add(name, tobytes(image, PIXEL_FORMAT), [source], size=image.get_size())   # -> pygame.image.tobytes()
+
+    for size in EXPLOSION_SIZES:
+        sheet = load_explosion_sheet(size)
+        add(f"explosion_{size}", tobytes(sheet, PIXEL_FORMAT), EXPLOSION_SOURCES, size=sheet.get_size())
+
+    for name, source in SOUNDS.items():
+        add(name, Sound(source).get_raw(), [source], mixer=get_init())   # -> pygame.mixer.Sound()
+
+    encoded = dumps(index).encode()
+    start   = HEADER.size + len(encoded)
+    padding = -start % ALIGNMENT
+
+    with open(pack_path, "wb") as pack_file:
+        pack_file.write(HEADER.pack(MAGIC, VERSION, len(encoded), start + padding))
+        pack_file.write(encoded + b"\0" * padding)
+        pack_file.write(b"".join(blobs))
+
+
+if __name__ == "__main__":
+    mixer_init(**MIXER_SETTINGS)   # -> pygame.mixer.init()
+
+    build()
+    print(f"{PACK_PATH}: {len(IMAGES)} images, {len(EXPLOSION_SIZES)} explosion sprite sheets and {len(SOUNDS)} sounds, "
+          f"{Path(PACK_PATH).stat().st_size} bytes")
@@ -0,0 +1,88 @@
+# Sound effects. The sounds are decoded once, ideally straight from the PCM in the asset pack, and played on a pool
+# of mixer channels instead of one fixed channel per sound
+from pygame.mixer import Channel, set_num_channels, fadeout
+
+from time import monotonic
+
+from assets import Assets
+
+# name: (volume, priority, minimum milliseconds between two plays, most voices playing at once)
+SOUNDS = {
+    "shoot":               (0.1, 1, 60, 2),
+    "meteorite_explosion": (0.05, 2, 40, 3),
+    "explosion":           (0.2, 3, 0, 1),
+    "game_over":           (0.05, 4, 0, 1),
+}
+
+CHANNELS = 8
+
+
+class NullAudio:
+    # Stands in for the audio engine when the game runs muted or headless, every call is a no-op
+    def play(self, name: str):
+        return False
+
+    def fadeout(self, milliseconds: int):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class AudioEngine:
+    # Plays sounds on a pool of 'channels' mixer channels. A sound played again within its minimum interval is
+    # coalesced into the voice that is already playing, e.g. a burst of shots or several meteorites destroyed on the
+    # same frame. A sound never plays on more than its number of voices, the oldest of them is restarted instead.
+    # When every channel is busy the oldest voice of the lowest priority is stolen, if it isn't more important
+    def __init__(self, assets: Assets, channels=CHANNELS):
+        set_num_channels(channels)   # -> pygame.mixer.set_num_channels()
+
+        self.sounds = {}
+        for name, (volume, *_) in SOUNDS.items():
+            sound = self.sounds[name] = assets.sound(name)
+            sound.set_volume(volume)
+
+        self.channels    = [Channel(i) for i in range(channels)]   # -> pygame.mixer.Channel()
+        self.voices      = [None] * channels                       # (name, priority, started) per channel
+        self.last_played = dict.fromkeys(SOUNDS, float("-inf"))
+
+        self.played = self.coalesced = self.stolen = self.dropped = 0
+
+    def play(self, name: str):
+        # Returns whether the sound started
+        _, priority, interval, max_voices = SOUNDS[name]
+        now = monotonic() * 1000
+
+        if now - self.last_played[name] < interval:
+            self.coalesced += 1
+            return False
+
+        # Forget the voices that have finished
+        channels, voices = self.channels, self.voices
+        for i, voice in enumerate(voices):
+            if voice is not None and not channels[i].get_busy():
+                voices[i] = None
+
+        playing = [i for i, voice in enumerate(voices) if voice is not None and voice[0] == name]
+        if len(playing) >= max_voices:
+            channel = min(playing, key=lambda i: voices[i][2])
+        elif None in voices:
+            channel = voices.index(None)
+        else:
+            channel = min(range(len(voices)), key=lambda i: voices[i][1:])
+            if voices[channel][1] > priority:
+                self.dropped += 1
+                return False
+            self.stolen += 1
+
+        channels[channel].play(self.sounds[name])
+        voices[channel] = (name, priority, now)
+        self.last_played[name] = now
+        self.played += 1
+        return True
+
+    def fadeout(self, milliseconds: int):
+        fadeout(milliseconds)   # -> pygame.mixer.fadeout()
+
+    def stats(self):
+        return {"played": self.played, "coalesced": self.coalesced, "stolen": self.stolen, "dropped": self.dropped}
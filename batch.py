@@ -0,0 +1,179 @@
+# Headless batch runner for difficulty tuning. Plays many games with a scripted or random policy on a process pool,
+# one seed per game, and aggregates the waves reached, the scores and the deaths per wave as JSON
+from argparse import ArgumentParser
+from collections import Counter
+from json import dump
+from multiprocessing import Pool
+from os import cpu_count
+from random import Random
+from statistics import mean
+from struct import Struct
+from sys import stdout, stderr
+from time import perf_counter
+
+from simulation import Simulation, Inputs, TICK_ELAPSED_TIME, SPACESHIP_DESTROYED, GAME_OVER, MAX_SEED, MAX_TICKS
+
+# A game's result is sent back from the worker as a few packed bytes instead of a pickled object:
+# the fixed size result followed by the wave of every death
+RESULT = Struct("<QIHIB")   # seed, score, wave, ticks, deaths
+DEATH  = Struct("<H")       # wave
+
+
+# Policies --------------------------------------------------------------
+# A policy prepares a fresh game and returns the inputs of every tick, 'tick(sim) -> Inputs'.
+# Its rng is seeded with the game's seed, so every game can be played again
+
+def idle(rng: Random):
+    return lambda sim: Inputs()
+
+
+def spin(rng: Random):
+    # Turn in place and shoot about every tenth of a second
+    return lambda sim: Inputs(left=True, shoot=rng.random() < 0.1)
+
+
+def random_keys(rng: Random):
+    # Hold a random set of keys for a random while, like a player mashing the keyboard
+    held = Inputs()
+
+    def tick(sim: Simulation):
+        nonlocal held
+        if rng.random() < 0.05:
+            held = Inputs(up=rng.random() < 0.3, down=rng.random() < 0.1, left=rng.random() < 0.4, right=rng.random() < 0.4)
+        return held._replace(shoot=rng.random() < 0.08)
+
+    return tick
+
+
+POLICIES = {
+    "idle":   idle,
+    "spin":   spin,
+    "random": random_keys,
+}
+
+
+# Playing ---------------------------------------------------------------
+
+def play_game(game: tuple):
+    # Play one game until it is over or cut off and return its packed result
+    seed, policy, array_world, max_ticks = game
+
+    sim    = Simulation(array_world=array_world, seed=seed)
+    tick   = POLICIES[policy](Random(seed))
+    deaths, ticks = [], 0
+
+    while ticks < max_ticks:
+        events = sim.step(tick(sim), TICK_ELAPSED_TIME)
+        ticks += 1
+
+        if SPACESHIP_DESTROYED in events:
+            deaths.append(sim.wave)
+        if GAME_OVER in events:
+            break
+
+    return RESULT.pack(seed, sim.score, sim.wave, ticks, len(deaths)) + b"".join(DEATH.pack(wave) for wave in deaths)
+
+
+def unpack_result(data: bytes):
+    seed, score, wave, ticks, death_count = RESULT.unpack_from(data)
+    deaths = [wave for wave, in DEATH.iter_unpack(data[RESULT.size:RESULT.size + death_count * DEATH.size])]
+    return seed, score, wave, ticks, deaths
+
+
+def run_batch(games: int, policy="random", first_seed=0, workers=None, array_world=False, max_ticks=MAX_TICKS):
+    # Yield the results of the games as they finish, in any order. The games are handed out to the workers in
+    # chunks, so the pool isn't kept busy passing single games around
+    batch = [(seed, policy, array_world, max_ticks) for seed in range(first_seed, first_seed + games)]
+
+    if workers == 1:
+        for game in batch:
+            yield unpack_result(play_game(game))
+        return
+
+    workers   = workers or cpu_count() or 1
+    chunksize = max(1, min(16, games // (workers * 4)))
+    with Pool(workers) as pool:
+        for data in pool.imap_unordered(play_game, batch, chunksize):
+            yield unpack_result(data)
+
+
+# Aggregating -----------------------------------------------------------
+
+def distribution(values: list):
+    values = sorted(values)
+    return {
+        "min":  values[0],
+        "p50":  values[(len(values) - 1) // 2],
+        "p90":  values[int(0.9 * (len(values) - 1))],
+        "max":  values[-1],
+        "mean": mean(values),
+    }
+
+
+def aggregate(results: list, max_ticks=MAX_TICKS):
+    scores = [score for _, score, _, _, _ in results]
+    waves  = [wave for _, _, wave, _, _ in results]
+    deaths = Counter(wave for *_, game_deaths in results for wave in game_deaths)
+
+    # Deaths per game that reached the wave, so later waves with fewer games stay comparable
+    reached = Counter(waves)
+    games_reaching, remaining = {}, len(results)
+    for wave in range(1, max(waves) + 1):
+        games_reaching[wave] = remaining
+        remaining -= reached.get(wave, 0)
+
+    worst = min(results, key=lambda result: result[1])
+    return {
+        "games":           len(results),
+        "score":           distribution(scores),
+        "wave":            distribution(waves),
+        "waves_reached":   {wave: reached[wave] for wave in sorted(reached)},
+        "deaths_per_wave": {
+            wave: {"deaths": deaths[wave], "per_game": deaths[wave] / games_reaching[wave]}
+            for wave in sorted(deaths)
+        },
+        "cut_off":         sum(1 for *_, ticks, _ in results if ticks >= max_ticks),
+        "worst_seed":      worst[0],
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Play many headless Meteorites games and aggregate their results")
+    parser.add_argument("games", type=int, help="number of games to play, one seed per game")
+    parser.add_argument("--policy", choices=POLICIES, default="random", help="how the games are played")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first game, the rest count up from it")
+    parser.add_argument("--workers", type=int, help="worker processes, one per core by default, 1 plays in this process")
+    parser.add_argument("--array-world", action="store_true", help="use the NumPy array backed world")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="cut off games that run longer than this")
+    parser.add_argument("--output", metavar="PATH", help="write the results into a JSON file instead of stdout")
+    arguments = parser.parse_args()
+
+    if arguments.games < 1:
+        parser.error("play at least one game")
+    if not 0 <= arguments.first_seed <= MAX_SEED - arguments.games + 1:
+        parser.error(f"the seeds of the games must be between 0 and {MAX_SEED}")
+
+    start, results = perf_counter(), []
+    for result in run_batch(arguments.games, arguments.policy, arguments.first_seed, arguments.workers,
+                            arguments.array_world, arguments.max_ticks):
+        results.append(result)
+        print(f"\r{len(results)}/{arguments.games} games", end="", flush=True, file=stderr)
+    print(file=stderr)
+    duration = perf_counter() - start
+
+    summary = {
+        "policy":      arguments.policy,
+        "array_world": arguments.array_world,
+        "workers":     arguments.workers or cpu_count(),
+        "seconds":     duration,
+        "games_per_s": len(results) / duration,
+        "ticks_per_s": sum(ticks for *_, ticks, _ in results) / duration,
+        **aggregate(results, arguments.max_ticks),
+    }
+
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            dump(summary, output, indent=2)
+    else:
+        dump(summary, stdout, indent=2)
+        print()
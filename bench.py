@@ -0,0 +1,312 @@
+# Scripted performance benchmark. Drives the simulation and the renderer through canned scenarios under the SDL
+# dummy video and audio drivers and reports frame time percentiles, throughput and peak memory as JSON.
+# Every scenario runs in a fresh process, so its peak memory isn't that of the scenarios before it
+from os import environ
+environ.setdefault("SDL_VIDEODRIVER", "dummy")
+environ.setdefault("SDL_AUDIODRIVER", "dummy")
+environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from pygame.display import init as display_init, set_mode
+from pygame.font    import init as font_init
+from pygame.mixer   import init as mixer_init
+from pygame         import quit, version
+
+from argparse import ArgumentParser
+from json import dump, load
+from math import ceil
+from multiprocessing import get_context
+from platform import python_version
+from subprocess import run, DEVNULL
+from sys import stdout, platform
+from time import perf_counter_ns
+import tracemalloc
+
+try:
+    from resource import getrusage, RUSAGE_SELF
+except ImportError:   # Windows
+    getrusage = None
+
+from simulation import Simulation, Inputs, TICK_ELAPSED_TIME
+from renderer   import Renderer
+from assets     import Assets, SOUNDS, PACK_PATH, MIXER_SETTINGS
+
+SEED = 1
+
+
+# Scenarios -------------------------------------------------------------
+# A scenario prepares a fresh simulation and returns the inputs of every frame, 'frame(sim, i) -> Inputs'
+
+def idle_wave():
+    def setup(sim: Simulation):
+        sim.fade_in, sim.fade_alpha = False, 0
+
+    return setup, lambda sim, i: Inputs()
+
+
+def late_wave(meteorites=300):
+    def setup(sim: Simulation):
+        sim.fade_in, sim.fade_alpha = False, 0
+        sim.wave = 20
+        sim.spawn_meteorites(meteorites)
+
+    def frame(sim: Simulation, i: int):
+        # Keep the spaceship alive so the frames stay comparable
+        sim.spaceship_destroyed, sim.lives_remaining = False, 3
+        return Inputs()
+
+    return setup, frame
+
+
+def bullet_spam():
+    def setup(sim: Simulation):
+        sim.fade_in, sim.fade_alpha = False, 0
+
+    def frame(sim: Simulation, i: int):
+        # Spin around and shoot every frame, the spaceship is kept alive
+        sim.spaceship_destroyed, sim.explosion_frame, sim.lives_remaining = False, 0, 3
+        return Inputs(left=True, shoot=True)
+
+    return setup, frame
+
+
+def explosion():
+    def setup(sim: Simulation):
+        sim.fade_in, sim.fade_alpha = False, 0
+
+    def frame(sim: Simulation, i: int):
+        # Loop the spaceship's explosion animation
+        sim.spaceship_destroyed, sim.lives_remaining = True, 3
+        sim.explosion_frame = (sim.explosion_frame + 0.2 * TICK_ELAPSED_TIME) % 27
+        return Inputs()
+
+    return setup, frame
+
+
+def splits(meteorites=60):
+    def setup(sim: Simulation):
+        sim.fade_in, sim.fade_alpha = False, 0
+        sim.wave = 20
+        sim.spawn_meteorites(meteorites)
+
+    def frame(sim: Simulation, i: int):
+        # Spin around and shoot into a crowded wave, so meteorites split and explode all the time
+        sim.spaceship_destroyed, sim.explosion_frame, sim.lives_remaining = False, 0, 3
+        return Inputs(left=True, shoot=True)
+
+    return setup, frame
+
+
+def fade():
+    def setup(sim: Simulation):
+        sim.fade_in, sim.fade_alpha = True, 255
+
+    def frame(sim: Simulation, i: int):
+        # Fade in and out back to back
+        if not sim.fade_in and not sim.fade_out:
+            if sim.fade_alpha == 0:
+                sim.fade_out = True
+            else:
+                sim.fade_in = True
+        return Inputs()
+
+    return setup, frame
+
+
+SCENARIOS = {
+    "idle_wave":   idle_wave,
+    "late_wave":   late_wave,
+    "bullet_spam": bullet_spam,
+    "explosion":   explosion,
+    "splits":      splits,
+    "fade":        fade,
+}
+
+
+# Measuring -------------------------------------------------------------
+
+def percentile(sorted_values, p: float):
+    # Nearest-rank percentile
+    return sorted_values[max(0, ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def peak_rss_kb():
+    # Peak resident memory of this process, None where it can't be read. Linux carries the peak of the parent over
+    # into ru_maxrss across fork and exec, so there the peak of this process alone is read from /proc
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    if getrusage is None:
+        return None
+    peak = getrusage(RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if platform == "darwin" else peak   # Bytes on macOS, kilobytes elsewhere
+
+
+def open_display():
+    display_init()                    # -> pygame.display.init()
+    font_init()                       # -> pygame.font.init()
+    mixer_init(**MIXER_SETTINGS)      # -> pygame.mixer.init()
+    return set_mode((800, 800))       # -> pygame.display.set_mode()
+
+
+def run_scenario(renderer: Renderer, name: str, frames: int, warmup: int, array_world: bool, trace_memory: bool):
+    renderer.reset()   # Start every scenario from a whole frame without the effects or sprites of the last one
+    renderer.sprite_cache.clear()
+
+    setup, frame = SCENARIOS[name]()
+
+    sim = Simulation(renderer.display.get_size(), array_world=array_world, seed=SEED)
+    setup(sim)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    frame_times = []
+    for i in range(warmup + frames):
+        start = perf_counter_ns()
+
+        sim.step(frame(sim, i), TICK_ELAPSED_TIME)
+        renderer.draw(sim)
+        renderer.present()
+
+        if i >= warmup:
+            frame_times.append(perf_counter_ns() - start)
+
+    result = {}
+    if trace_memory:
+        result["python_heap_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    frame_times.sort()
+    total = sum(frame_times)
+    return {
+        "frames":        frames,
+        "p50_ms":        percentile(frame_times, 50) / 1e6,
+        "p95_ms":        percentile(frame_times, 95) / 1e6,
+        "p99_ms":        percentile(frame_times, 99) / 1e6,
+        "max_ms":        frame_times[-1] / 1e6,
+        "mean_ms":       total / frames / 1e6,
+        "fps":           frames / (total / 1e9),
+        "meteorites":    sim.meteorite_count,
+        "bullets":       sim.bullet_count,
+        "peak_rss_kb":   peak_rss_kb(),
+        "sprite_cache":  renderer.sprite_cache.stats(),
+        "text_cache":    renderer.text.stats(),
+        **result,
+    }
+
+
+def scenario_process(name: str, frames: int, warmup: int, array_world: bool, trace_memory: bool, dirty_rects: bool,
+                     pack_path):
+    # Runs one scenario from scratch, in a process of its own
+    renderer = Renderer(open_display(), assets=Assets(pack_path), dirty_rects=dirty_rects)
+    result   = run_scenario(renderer, name, frames, warmup, array_world, trace_memory)
+    quit()   # -> pygame.quit()
+    return result
+
+
+def run_isolated(*arguments):
+    # A new interpreter per scenario, forked processes would share the memory of this one
+    with get_context("spawn").Pool(1) as pool:
+        return pool.apply(scenario_process, arguments)
+
+
+def measure_startup(display, pack_path, dirty_rects):
+    # Time from nothing loaded to the first frame on the screen, including the sounds
+    start = perf_counter_ns()
+
+    assets   = Assets(pack_path)
+    renderer = Renderer(display, assets=assets, dirty_rects=dirty_rects)
+    for name in SOUNDS:
+        assets.sound(name)
+    loaded = perf_counter_ns()
+
+    renderer.draw(Simulation(display.get_size(), seed=SEED))
+    renderer.present()
+    first_frame = perf_counter_ns()
+
+    startup = {
+        "asset_pack":     assets.packed,
+        "load_ms":        (loaded - start) / 1e6,
+        "first_frame_ms": (first_frame - start) / 1e6,
+    }
+    return renderer, startup
+
+
+def git_commit():
+    try:
+        return run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, stdin=DEVNULL).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: dict, baseline: dict):
+    # Print the change of the startup and of every percentile against an earlier run
+    if "startup" in baseline:
+        before, after = baseline["startup"]["first_frame_ms"], results["startup"]["first_frame_ms"]
+        print(f"{'startup':<12} first frame {before:.1f} -> {after:.1f} ms ({(after - before) / before * 100:+.1f}%)")
+
+    for name, scenario in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+
+        changes = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (scenario[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(f"{key[:3]} {before[key]:.3f} -> {scenario[key]:.3f} ms ({change:+.1f}%)")
+        print(f"{name:<12} " + ", ".join(changes))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark Meteorites through canned scenarios")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                        help=f"scenarios to run, all of them by default: {', '.join(SCENARIOS)}")
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=60, help="frames run before measuring")
+    parser.add_argument("--array-world", action="store_true", help="use the NumPy array backed world")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report the peak Python heap, slows down the frames while measuring")
+    parser.add_argument("--dirty-rects", action="store_true", help="update only the changed parts of the screen")
+    parser.add_argument("--no-pack", action="store_true",
+                        help="load the assets from their source files even if the asset pack is built")
+    parser.add_argument("--output", metavar="PATH", help="write the results into a JSON file instead of stdout")
+    parser.add_argument("--compare", metavar="PATH", help="print the changes against an earlier results file")
+    arguments = parser.parse_args()
+
+    for name in arguments.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario '{name}', choose from {', '.join(SCENARIOS)}")
+
+    pack_path = None if arguments.no_pack else PACK_PATH
+    _, startup = measure_startup(open_display(), pack_path, arguments.dirty_rects)
+    quit()   # -> pygame.quit()
+
+    results = {
+        "commit":      git_commit(),
+        "python":      python_version(),
+        "pygame":      version.ver,
+        "array_world": arguments.array_world,
+        "dirty_rects": arguments.dirty_rects,
+        "startup":     startup,
+        "scenarios":   {
+            name: run_isolated(name, arguments.frames, arguments.warmup, arguments.array_world,
+                               arguments.trace_memory, arguments.dirty_rects, pack_path)
+            for name in (arguments.scenarios or SCENARIOS)
+        },
+    }
+
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            dump(results, output, indent=2)
+    else:
+        dump(results, stdout, indent=2)
+        print()
+
+    if arguments.compare:
+        with open(arguments.compare) as baseline:
+            compare(results, load(baseline))
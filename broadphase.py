@@ -0,0 +1,77 @@
+from math import floor
+
+
+class SpatialHash:
+    # Uniform grid broadphase for the meteorite collisions. Every meteorite is inserted into each cell its hit
+    # circle overlaps, and since the cells are at least as wide as the largest hit circle, a point only needs to
+    # look at the meteorites of its own cell. Rebuilding the grid and querying it are both linear in the entity count
+    def __init__(self, min_cell_size=16):
+        self.min_cell_size = min_cell_size
+        self.cell_size     = min_cell_size
+        self.cells         = {}   # (column, row) -> indices of the entities overlapping the cell, in ascending order
+
+    def rebuild(self, xs, ys, radii, margin=0.0):
+        # The cell size follows the largest hit circle, e.g. the bounding circle of the biggest meteorite.
+        # 'margin' widens every circle, e.g. by the distance a bullet moves in a step: a path that starts outside
+        # a meteorite's cells and clips it in the next cell then still finds it in the cell the path starts in
+        self.cell_size = max(self.min_cell_size, 2 * (max(radii, default=0) + margin))
+        self.cells     = cells = {}
+
+        # A circle is never wider than a cell, so it overlaps at most two columns and two rows
+        cell_size = self.cell_size
+        for i, (x, y, radius) in enumerate(zip(xs, ys, radii)):
+            radius += margin
+            left, right = floor((x - radius) / cell_size), floor((x + radius) / cell_size)
+            top, bottom = floor((y - radius) / cell_size), floor((y + radius) / cell_size)
+            for column in ((left,) if left == right else (left, right)):
+                for row in ((top,) if top == bottom else (top, bottom)):
+                    cell = cells.get((column, row))
+                    if cell is None:
+                        cells[(column, row)] = [i]
+                    else:
+                        cell.append(i)
+
+    def candidates(self, x: float, y: float):
+        return self.cells.get((floor(x / self.cell_size), floor(y / self.cell_size)), ())
+
+    def candidates_near(self, x: float, y: float, radius: float):
+        # The entities of every cell a circle overlaps, in ascending order, e.g. for something bigger than a point
+        cell_size = self.cell_size
+        columns = range(floor((x - radius) / cell_size), floor((x + radius) / cell_size) + 1)
+        rows    = range(floor((y - radius) / cell_size), floor((y + radius) / cell_size) + 1)
+        if len(columns) == 1 and len(rows) == 1:
+            return self.cells.get((columns[0], rows[0]), ())
+
+        entities = set()
+        for column in columns:
+            for row in rows:
+                entities.update(self.cells.get((column, row), ()))
+        return sorted(entities)
+
+    def pairs(self, xs, ys):
+        # Every (point, entity) pair sharing a cell as two lists, grouped by point and both in ascending order,
+        # e.g. to test all the pairs at once with NumPy
+        cells, cell_size = self.cells, self.cell_size
+        points, entities = [], []
+        for point_index, (x, y) in enumerate(zip(xs, ys)):
+            cell = cells.get((floor(x / cell_size), floor(y / cell_size)))
+            if cell:
+                points.extend([point_index] * len(cell))
+                entities.extend(cell)
+        return points, entities
+
+    def hits(self, points, collide):
+        # Pair every point with the first candidate that 'collide(index, point_index)' confirms. An entity can only
+        # be hit once, so later points hitting an already claimed entity fly on. Nothing is removed here, the caller
+        # removes the returned (points, entities) afterwards so no collision gets skipped
+        claimed, point_hits, entity_hits = set(), [], []
+
+        for point_index, point in enumerate(points):
+            for entity in self.candidates(*point):
+                if entity not in claimed and collide(entity, point_index):
+                    claimed.add(entity)
+                    point_hits.append(point_index)
+                    entity_hits.append(entity)
+                    break
+
+        return point_hits, entity_hits
@@ -0,0 +1,68 @@
+# Explosion animations. The frames of the explosion are packed side by side into one sprite sheet per size, see
+# Assets.explosion_sheet(), and every running explosion is a slot of a fixed size pool, so any number of them is drawn
+# with one blits call
+from pygame import Surface
+
+from assets import Assets, EXPLOSION_FRAMES
+
+EXPLOSION_RATE = 0.2   # Frames per elapsed time unit, the same as the spaceship's explosion
+
+
+class Explosions:
+    # A pool of 'capacity' explosion slots. Every attribute lives in its own preallocated list and the free slots
+    # are kept on a stack, so spawning an explosion only writes numbers into a free slot. When the pool is full,
+    # the explosion closest to its end is restarted at the new place
+    def __init__(self, assets: Assets, capacity=64):
+        self.assets   = assets
+        self.capacity = capacity
+
+        self.x      = [0.0] * capacity   # Center
+        self.y      = [0.0] * capacity
+        self.size   = [0] * capacity
+        self.frame  = [0.0] * capacity
+        self.free   = list(range(capacity - 1, -1, -1))
+        self.active = []                 # Slots in the order they were spawned
+
+    def __len__(self):
+        return len(self.active)
+
+    def spawn(self, x: float, y: float, size: int):
+        if self.free:
+            slot = self.free.pop()
+            self.active.append(slot)
+        else:
+            slot = max(self.active, key=self.frame.__getitem__)
+
+        self.x[slot], self.y[slot], self.size[slot], self.frame[slot] = x, y, size, 0.0
+
+    def clear(self):
+        self.free.extend(self.active)
+        self.active = []
+
+    def update(self, elapsed_time: float):
+        frames, step = self.frame, EXPLOSION_RATE * elapsed_time
+        running = []
+        for slot in self.active:
+            frames[slot] += step
+            if frames[slot] < EXPLOSION_FRAMES:
+                running.append(slot)
+            else:
+                self.free.append(slot)
+        self.active = running
+
+    def draw(self, surface: Surface):
+        # Blit every running explosion at once and return the rects they cover
+        if not self.active:
+            return []
+
+        sheets, blits = {}, []
+        for slot in self.active:
+            size  = self.size[slot]
+            sheet = sheets.get(size)
+            if sheet is None:
+                sheet = sheets[size] = self.assets.explosion_sheet(size)
+
+            half = size / 2
+            blits.append((sheet[0], (self.x[slot] - half, self.y[slot] - half), sheet[1][int(self.frame[slot])]))
+
+        return surface.blits(blits)   # -> pygame.Surface.blits()
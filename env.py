@@ -0,0 +1,209 @@
+# Reset/step environment around the simulation for training agents, in the style of Gym: 'reset()' returns
+# (observation, info) and 'step(action)' returns (observation, reward, terminated, truncated, info).
+# The observation is either a fixed-shape NumPy state vector or the rendered pixels, both are written in place into
+# one preallocated array on every step, so nothing is copied or allocated per step. 'VectorEnv' steps many
+# environments in one call and stacks their observations into one array
+from math import sin, cos, radians
+
+from simulation import Simulation, Inputs, TICK_ELAPSED_TIME, GAME_OVER, MAX_TICKS
+
+try:
+    import numpy as np
+except ImportError:   # NumPy is only needed for the environments
+    np = None
+
+# Every action is an index into this table: thrust (none, up, down) x turn (none, left, right) x shoot
+ACTIONS = [
+    Inputs(up=thrust == 1, down=thrust == 2, left=turn == 1, right=turn == 2, shoot=shoot)
+    for thrust in range(3) for turn in range(3) for shoot in (False, True)
+]
+
+# Layout of the state vector. Positions and sizes are in fractions of the screen, directions are (sin, cos) pairs
+SPACESHIP = 9   # x, y, speed, sin rotation, cos rotation, destroyed, lives, wave, score
+METEORITE = 6   # present, x, y, sin direction, cos direction, radius
+BULLET    = 3   # present, x, y
+
+
+def state_size(max_meteorites: int, max_bullets: int):
+    return SPACESHIP + METEORITE * max_meteorites + BULLET * max_bullets
+
+
+class Env:
+    # One game. The reward of a step is the score it gained, a game is terminated when it is over and truncated
+    # after 'max_ticks' steps. 'observation' is "state" or "pixels": the state vector holds the first 'max_meteorites'
+    # meteorites and 'max_bullets' bullets, and the pixels are an (height, width, 3) RGB view of the renderer's
+    # surface, which is drawn straight into the observation array. Either way the returned observation is the same
+    # array on every step, copy it to keep it. 'out' is a preallocated observation array to write into instead,
+    # (state size,) float32 for the state or (height, width, 4) uint8 for the pixels
+    def __init__(self, dimensions=(800, 800), observation="state", array_world=False, max_meteorites=32, max_bullets=32,
+                 max_ticks=MAX_TICKS, out=None, assets=None):
+        if np is None:
+            raise ImportError("the environments require NumPy")
+        if observation not in ("state", "pixels"):
+            raise ValueError(f"unknown observation '{observation}', choose from state, pixels")
+
+        self.dimensions     = self.width, self.height = dimensions
+        self.observation    = observation
+        self.array_world    = array_world
+        self.max_meteorites = max_meteorites
+        self.max_bullets    = max_bullets
+        self.max_ticks      = max_ticks
+        self.sim, self.ticks = None, 0
+
+        if observation == "state":
+            self.state = np.zeros(state_size(max_meteorites, max_bullets), np.float32) if out is None else out
+
+            # Views into the state vector, one row per entity
+            end = SPACESHIP + METEORITE * max_meteorites
+            self.spaceship_state = self.state[:SPACESHIP]
+            self.meteorite_state = self.state[SPACESHIP:end].reshape(max_meteorites, METEORITE)
+            self.bullet_state    = self.state[end:].reshape(max_bullets, BULLET)
+            self.renderer        = None
+        else:
+            self.renderer, self.pixels = self.create_renderer(out, assets)
+
+    def create_renderer(self, out, assets):
+        # The renderer draws on a Surface that shares its memory with the observation array
+        from pygame.display import init as display_init, get_surface, set_mode
+        from pygame.font    import init as font_init
+        from pygame.image   import frombuffer
+        from pygame         import HIDDEN
+        from renderer       import Renderer
+
+        display_init()   # -> pygame.display.init()
+        font_init()      # -> pygame.font.init()
+        if get_surface() is None:
+            set_mode((1, 1), HIDDEN)   # -> pygame.display.set_mode(), the images are converted to its format
+
+        buffer  = np.zeros((self.height, self.width, 4), np.uint8) if out is None else out
+        surface = frombuffer(buffer, self.dimensions, "RGBX")   # -> pygame.image.frombuffer()
+        return Renderer(surface, assets=assets), buffer[..., :3]
+
+    def reset(self, seed=None):
+        self.sim   = Simulation(self.dimensions, array_world=self.array_world, seed=seed)
+        self.ticks = 0
+
+        # Agents start playing right away instead of watching the fade
+        self.sim.fade_in, self.sim.fade_alpha = False, 0
+        if self.renderer is not None:
+            self.renderer.reset()
+        return self.observe(), {"seed": seed}
+
+    def step(self, action: int):
+        sim   = self.sim
+        score = sim.score
+
+        events = sim.step(ACTIONS[action], TICK_ELAPSED_TIME)
+        self.ticks += 1
+
+        terminated = GAME_OVER in events
+        truncated  = not terminated and self.ticks >= self.max_ticks
+        return self.observe(), sim.score - score, terminated, truncated, {"events": events}
+
+    # Observations --------------------------------------------------
+
+    def observe(self):
+        if self.renderer is not None:
+            self.renderer.draw(self.sim)
+            return self.pixels
+
+        sim, world = self.sim, self.sim.world
+        width, height = self.width, self.height
+
+        self.spaceship_state[:] = (
+            sim.spaceship_location[0] / width, sim.spaceship_location[1] / height, sim.spaceship_speed,
+            sin(radians(sim.spaceship_rotation)), cos(radians(sim.spaceship_rotation)),
+            sim.spaceship_destroyed, sim.lives_remaining, sim.wave, sim.score,
+        )
+
+        meteorites, bullets = self.meteorite_state, self.bullet_state
+        meteorites[:] = 0
+        bullets[:]    = 0
+
+        if world is not None:
+            # The steps of the meteorites are their direction scaled by their speed of 0.5
+            m = min(world.meteorite_count, self.max_meteorites)
+            meteorites[:m, 0] = 1
+            meteorites[:m, 1] = world.m_x[:m] / width
+            meteorites[:m, 2] = world.m_y[:m] / height
+            meteorites[:m, 3] = world.m_step_x[:m] * 2
+            meteorites[:m, 4] = world.m_step_y[:m] * 2
+            meteorites[:m, 5] = world.m_radius[:m] / width
+
+            b = min(world.bullet_count, self.max_bullets)
+            bullets[:b, 0] = 1
+            bullets[:b, 1] = world.b_x[:b] / width
+            bullets[:b, 2] = world.b_y[:b] / height
+            return self.state
+
+        m = min(len(sim.meteorites), self.max_meteorites)
+        if m:
+            rows = [
+                (meteorite.x, meteorite.y, meteorite.direction, meteorite.bounding_radius)
+                for meteorite in sim.meteorites[:m]
+            ]
+            meteorites[:m, 0] = 1
+            columns = np.array(rows, np.float32)
+            meteorites[:m, 1] = columns[:, 0] / width
+            meteorites[:m, 2] = columns[:, 1] / height
+            meteorites[:m, 3] = np.sin(np.radians(columns[:, 2]))
+            meteorites[:m, 4] = np.cos(np.radians(columns[:, 2]))
+            meteorites[:m, 5] = columns[:, 3] / width
+
+        b = min(len(sim.bullets), self.max_bullets)
+        if b:
+            bullets[:b, 0] = 1
+            bullets[:b, 1:] = [bullet_location for bullet_location, _ in sim.bullets[:b]]
+            bullets[:b, 1] /= width
+            bullets[:b, 2] /= height
+        return self.state
+
+
+class VectorEnv:
+    # Steps 'count' environments at once. Every environment writes its observation into its own row of one stacked
+    # array, so stepping them all returns (count, ...) observations without copying. Environments whose game ended
+    # are reset right away with the next unused seed, and their row holds the first observation of the new game
+    def __init__(self, count: int, seed=0, observation="state", **env_arguments):
+        if np is None:
+            raise ImportError("the environments require NumPy")
+
+        dimensions = env_arguments.get("dimensions", (800, 800))
+        if observation == "state":
+            size = state_size(env_arguments.get("max_meteorites", 32), env_arguments.get("max_bullets", 32))
+            self.buffer       = np.zeros((count, size), np.float32)
+            self.observations = self.buffer
+        else:
+            self.buffer       = np.zeros((count, dimensions[1], dimensions[0], 4), np.uint8)
+            self.observations = self.buffer[..., :3]
+
+            # The images are loaded once for every environment
+            from assets import Assets
+            env_arguments.setdefault("assets", Assets())
+
+        self.envs = [Env(observation=observation, out=self.buffer[i], **env_arguments) for i in range(count)]
+        self.seed, self.next_seed = seed, seed
+
+        self.rewards    = np.zeros(count, np.float32)
+        self.terminated = np.zeros(count, bool)
+        self.truncated  = np.zeros(count, bool)
+
+    def reset(self):
+        seeds = list(range(self.seed, self.seed + len(self.envs)))
+        for env, seed in zip(self.envs, seeds):
+            env.reset(seed)
+        self.next_seed = self.seed + len(self.envs)
+        return self.observations, {"seeds": seeds}
+
+    def step(self, actions):
+        # 'actions' holds one action index per environment
+        events = []
+        for i, (env, action) in enumerate(zip(self.envs, np.asarray(actions).tolist())):
+            _, reward, terminated, truncated, info = env.step(action)
+            self.rewards[i], self.terminated[i], self.truncated[i] = reward, terminated, truncated
+            events.append(info["events"])
+
+            if terminated or truncated:
+                env.reset(self.next_seed)
+                self.next_seed += 1
+
+        return self.observations, self.rewards, self.terminated, self.truncated, {"events": events}
@@ -0,0 +1,218 @@
+# Local leaderboard of the best games. The scores are kept in a small binary file that is never unpickled or
+# evaluated, every write replaces the whole file atomically, and a lock file serializes the games writing to it
+from argparse import ArgumentParser
+from datetime import datetime
+from getpass import getuser
+from os import replace, fsync, remove
+from pathlib import Path
+from pickle import Unpickler, UnpicklingError
+from queue import SimpleQueue
+from struct import Struct, error as StructError
+from tempfile import mkstemp
+from threading import Thread
+from time import time
+from typing import NamedTuple
+from zlib import crc32
+
+try:
+    from fcntl import flock, LOCK_EX, LOCK_UN
+except ImportError:   # Windows
+    from msvcrt import locking, LK_LOCK, LK_UNLCK
+    flock = None
+
+LEADERBOARD_PATH = "meteorites.leaderboard"
+LEGACY_PATH      = "meteorites.save"   # The high score of older versions, a pickled integer
+
+# A leaderboard file is a fixed size header followed by the entries, best first. Each entry is a fixed size
+# record followed by the player's name in UTF-8. The checksum covers the entries, so a torn file is never read
+MAGIC, VERSION = b"MTLB", 1
+HEADER         = Struct("<4sBHI")   # magic, version, entries, CRC32 of the entries
+RECORD         = Struct("<QHdB")    # score, wave, date as a Unix timestamp, length of the name
+MAX_NAME       = 32                 # Bytes
+
+SIZE = 10   # Entries kept
+
+
+class Entry(NamedTuple):
+    score:  int
+    wave:   int
+    date:   float
+    player: str
+
+
+def default_player():
+    try:
+        return getuser()
+    except (OSError, KeyError):
+        return "player"
+
+
+# Format ----------------------------------------------------------------
+
+def pack_entries(entries: list):
+    data = bytearray()
+    for entry in entries:
+        name = entry.player.encode()[:MAX_NAME].decode(errors="ignore").encode()
+        data += RECORD.pack(entry.score, entry.wave, entry.date, len(name)) + name
+    return HEADER.pack(MAGIC, VERSION, len(entries), crc32(data)) + data
+
+
+def unpack_entries(data: bytes):
+    magic, version, count, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} Meteorites leaderboard")
+    if crc32(data[HEADER.size:]) != checksum:
+        raise ValueError("the leaderboard is corrupted")
+
+    entries, offset = [], HEADER.size
+    for _ in range(count):
+        score, wave, date, name_length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        entries.append(Entry(score, wave, date, data[offset:offset + name_length].decode()))
+        offset += name_length
+    return entries
+
+
+def merge(entries: list, new_entries: list, size=SIZE):
+    # The best 'size' entries without duplicates, ties go to the earlier game
+    return sorted(set(entries + new_entries), key=lambda entry: (-entry.score, entry.date))[:size]
+
+
+class ScoreOnlyUnpickler(Unpickler):
+    # Refuses to load anything but plain values, no classes or functions are ever looked up
+    def find_class(self, module, name):
+        raise UnpicklingError(f"{module}.{name} is not allowed in {LEGACY_PATH}")
+
+
+def load_legacy_high_score(path=LEGACY_PATH):
+    try:
+        with open(path, "rb") as savefile:
+            high_score = ScoreOnlyUnpickler(savefile).load()
+    except (OSError, EOFError, UnpicklingError, ValueError):
+        return 0
+    return high_score if type(high_score) is int and high_score > 0 else 0
+
+
+# File ------------------------------------------------------------------
+
+class FileLock:
+    # Exclusive lock on '<path>.lock' shared by every process, held while the leaderboard is read and replaced
+    def __init__(self, path: Path):
+        self.path = path.with_name(path.name + ".lock")
+
+    def __enter__(self):
+        self.file = open(self.path, "a+b")
+        if flock is not None:
+            flock(self.file.fileno(), LOCK_EX)
+        else:
+            self.file.seek(0)
+            locking(self.file.fileno(), LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exception):
+        if flock is not None:
+            flock(self.file.fileno(), LOCK_UN)
+        else:
+            self.file.seek(0)
+            locking(self.file.fileno(), LK_UNLCK, 1)
+        self.file.close()
+
+
+def read(path: Path):
+    try:
+        return unpack_entries(path.read_bytes())
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, StructError, UnicodeDecodeError):
+        return []   # A damaged leaderboard starts over instead of stopping the game
+
+
+def write(path: Path, entries: list):
+    # Write next to the leaderboard and rename over it, so a crash leaves either the old or the new file
+    handle, temporary = mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with open(handle, "wb") as temporary_file:
+            temporary_file.write(pack_entries(entries))
+            temporary_file.flush()
+            fsync(temporary_file.fileno())
+        replace(temporary, path)
+    except BaseException:
+        remove(temporary)
+        raise
+
+
+class Leaderboard:
+    # The entries are read once when created. 'submit()' updates them right away and leaves the writing to a
+    # background thread, which merges the game into whatever other games wrote to the file in the meantime.
+    # 'close()' waits for the pending writes
+    def __init__(self, path=LEADERBOARD_PATH, size=SIZE):
+        self.path, self.size = Path(path), size
+        self.entries = read(self.path)
+        self.error   = None   # The last error of the writer, the game goes on without saving
+
+        # Keep the high score of older versions on the board
+        if not self.entries and Path(LEGACY_PATH).is_file():
+            high_score = load_legacy_high_score()
+            if high_score:
+                self.entries = [Entry(high_score, 0, Path(LEGACY_PATH).stat().st_mtime, "")]
+
+        self.queue  = SimpleQueue()
+        self.writer = Thread(target=self.write_entries, name="leaderboard writer", daemon=True)
+        self.writer.start()
+
+    @property
+    def high_score(self):
+        return self.entries[0].score if self.entries else 0
+
+    def qualifies(self, score: int):
+        return score > 0 and (len(self.entries) < self.size or score > self.entries[-1].score)
+
+    def submit(self, score: int, wave: int, player=None):
+        # Returns whether the game made it onto the leaderboard
+        if not self.qualifies(score):
+            return False
+
+        entry = Entry(score, wave, time(), player if player is not None else default_player())
+        self.entries = merge(self.entries, [entry], self.size)
+        self.queue.put(entry)
+        return True
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join()
+
+    def write_entries(self):
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                return
+
+            # Write every game that was submitted meanwhile at once
+            new_entries, done = [entry], False
+            while not self.queue.empty():
+                entry = self.queue.get()
+                if entry is None:
+                    done = True
+                    break
+                new_entries.append(entry)
+
+            try:
+                with FileLock(self.path):
+                    # Without a file yet, carry over what only this process knows of, e.g. the legacy high score
+                    entries = read(self.path) or self.entries
+                    write(self.path, merge(entries, new_entries, self.size))
+            except OSError as error:
+                self.error = error
+
+            if done:
+                return
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Show the Meteorites leaderboard")
+    parser.add_argument("path", nargs="?", default=LEADERBOARD_PATH, help="leaderboard file")
+    arguments = parser.parse_args()
+
+    for rank, entry in enumerate(read(Path(arguments.path)), 1):
+        date = datetime.fromtimestamp(entry.date).strftime("%Y-%m-%d %H:%M")
+        print(f"{rank:>2}. {entry.score:>8}  wave {entry.wave:>3}  {date}  {entry.player}")
@@ -0,0 +1,160 @@
+from itertools import count
+from math import sin, cos, radians, hypot
+import random
+
+# Identifies a meteorite's outline, e.g. in the sprite cache
+shape_ids = count()
+
+# The verts are evenly spaced around the meteorite, so their directions from its center are computed only once
+VERTS           = 20
+VERT_DIRECTIONS = [(-sin(radians(360 / VERTS * i)), -cos(radians(360 / VERTS * i))) for i in range(VERTS)]
+
+
+class Meteorite:
+    def __init__(self, dimensions: tuple, size=140, rng=random):
+        # 'rng' is the random number generator of the game, the global 'random' module or a seeded 'random.Random'
+        randint, uniform = rng.randint, rng.uniform
+
+        self.points             = []               # The points' positions on the meteorite's own surface
+        self.meteorite_rotation = uniform(-1, 1)
+        self.rotation_speed     = uniform(-1, 1)
+        self.direction          = randint(0, 360)
+        self.meteorite_size     = self.avg_size = size
+        self.shape_id           = next(shape_ids)
+
+        # Randomize the meteorite's spawning point
+        width, height = dimensions
+        side = randint(1, 4)  # 1 up, 2 right, 3 down, 4 left
+        if side == 1:
+            self.x, self.y = randint(0, width), -self.meteorite_size
+        elif side == 2:
+            self.x, self.y = width+self.meteorite_size, randint(0, height)
+        elif side == 3:
+            self.x, self.y = randint(0, width), height+self.meteorite_size
+        elif side == 4:
+            self.x, self.y = -self.meteorite_size, randint(0, height)
+
+        # Generate the meteorite
+        center, min_radius, max_radius = int(self.meteorite_size / 2), int(self.meteorite_size/3), int(self.meteorite_size/2)
+        vert_sizes = []
+        for direction_x, direction_y in VERT_DIRECTIONS:
+            radius = randint(min_radius, max_radius)
+            vert_sizes.append(radius)
+            self.points.append((center + direction_x * radius, center + direction_y * radius))
+
+        self.avg_size = sum(vert_sizes) / len(vert_sizes)
+
+        # The outline around the center of the sprite, which the sprite is rotated around, and the circle bounding it.
+        # The collisions are tested against the outline, but only inside the circle
+        half = self.meteorite_size / 2
+        self.outline         = [(x - half, y - half) for x, y in self.points]
+        self.bounding_radius = max(hypot(x, y) for x, y in self.outline)
+
+    def move(self, dimensions: tuple, elapsed_time: float):
+        # Move and rotate the meteorite
+        self.x += sin(radians(self.direction)) * (0.5 * elapsed_time)
+        self.y += cos(radians(self.direction)) * (0.5 * elapsed_time)
+        self.meteorite_rotation += self.rotation_speed * elapsed_time
+        self.meteorite_rotation = self.meteorite_rotation % 359
+
+        # Check if the meteorite is in the screen. If it's not, move it to the other side
+        if self.x > dimensions[0] + (self.meteorite_size / 2):
+            self.x = -self.meteorite_size
+        elif self.x < -self.meteorite_size:
+            self.x = dimensions[0] + (self.meteorite_size / 2)
+        if self.y > dimensions[1] + (self.meteorite_size / 2):
+            self.y = -self.meteorite_size
+        elif self.y < -self.meteorite_size:
+            self.y = dimensions[1] + (self.meteorite_size / 2)
+
+    # Collisions ----------------------------------------------------
+
+    # Check if given coordinates are inside the meteorite
+    def collide(self, obj_pos: tuple):
+        x, y = obj_pos[0] - self.x, obj_pos[1] - self.y
+        if x * x + y * y >= self.bounding_radius ** 2:
+            return False
+
+        # The sprite is rotated counterclockwise on the screen, so turning an offset from the center back by the
+        # rotation places it on the unrotated outline: (x cos - y sin, x sin + y cos)
+        angle = radians(self.meteorite_rotation)
+        cos_angle, sin_angle = cos(angle), sin(angle)
+        return point_in_polygon(self.outline, x * cos_angle - y * sin_angle, x * sin_angle + y * cos_angle)
+
+    # Check if the line segment between given coordinates touches the meteorite, e.g. the path of a bullet
+    def collide_segment(self, start: tuple, end: tuple):
+        start_x, start_y = start[0] - self.x, start[1] - self.y
+        end_x, end_y     = end[0] - self.x, end[1] - self.y
+        if segment_distance_squared(start_x, start_y, end_x, end_y) >= self.bounding_radius ** 2:
+            return False
+
+        return self.collide_outline_segment(start_x, start_y, end_x, end_y, self.meteorite_rotation)
+
+    # Check if the outline of a polygon given in screen coordinates touches the meteorite, e.g. the spaceship
+    def collide_polygon(self, points: list):
+        return any(self.collide_segment(points[i - 1], points[i]) for i in range(len(points)))
+
+    # Check if the line segment between given offsets from the center touches the outline turned by 'rotation'.
+    # The bounding circle isn't tested, e.g. when the array backed world already tested every circle at once
+    def collide_outline_segment(self, start_x: float, start_y: float, end_x: float, end_y: float, rotation: float):
+        angle = radians(rotation)
+        cos_angle, sin_angle = cos(angle), sin(angle)
+        start = (start_x * cos_angle - start_y * sin_angle, start_x * sin_angle + start_y * cos_angle)
+        end   = (end_x * cos_angle - end_y * sin_angle, end_x * sin_angle + end_y * cos_angle)
+        return point_in_polygon(self.outline, *end) or segment_crosses_polygon(self.outline, start, end)
+
+
+def point_in_polygon(points: list, x: float, y: float):
+    # Even-odd rule, count the edges a ray from the point to the right crosses
+    inside = False
+    previous_x, previous_y = points[-1]
+    for point_x, point_y in points:
+        if (point_y > y) != (previous_y > y) and \
+                x < previous_x + (y - previous_y) * (point_x - previous_x) / (point_y - previous_y):
+            inside = not inside
+        previous_x, previous_y = point_x, point_y
+    return inside
+
+
+def segment_crosses_polygon(points: list, start: tuple, end: tuple):
+    # Whether the segment crosses any edge of the polygon, the signs of the cross products tell which side
+    # of one segment the ends of the other are on
+    (start_x, start_y), (end_x, end_y) = start, end
+    direction_x, direction_y = end_x - start_x, end_y - start_y
+
+    previous_x, previous_y = points[-1]
+    for point_x, point_y in points:
+        side_previous = direction_x * (previous_y - start_y) - direction_y * (previous_x - start_x)
+        side_point    = direction_x * (point_y - start_y) - direction_y * (point_x - start_x)
+        if (side_previous > 0) != (side_point > 0):
+            edge_x, edge_y = point_x - previous_x, point_y - previous_y
+            side_start = edge_x * (start_y - previous_y) - edge_y * (start_x - previous_x)
+            side_end   = edge_x * (end_y - previous_y) - edge_y * (end_x - previous_x)
+            if (side_start > 0) != (side_end > 0):
+                return True
+        previous_x, previous_y = point_x, point_y
+    return False
+
+
+def segment_distance_squared(start_x: float, start_y: float, end_x: float, end_y: float):
+    # Squared distance from the origin to the closest point of the segment
+    direction_x, direction_y = end_x - start_x, end_y - start_y
+    length_squared = direction_x * direction_x + direction_y * direction_y
+    t = 0.0 if length_squared == 0 else min(max(-(start_x * direction_x + start_y * direction_y) / length_squared, 0.0), 1.0)
+    closest_x, closest_y = start_x + t * direction_x, start_y + t * direction_y
+    return closest_x * closest_x + closest_y * closest_y
+
+
+def split_meteorite(dimensions: tuple, meteorite: Meteorite, rng=random):
+    # When the meteorite is destroyed, create two smaller ones to the same location, but in other directions.
+    # If the meteorite has been divided multiple times, just remove it, to avoid creating meteorites the size of an atom
+    children = []
+    if meteorite.meteorite_size/2 >= 35:
+        for child in range(2):
+            smaller_meteorite = Meteorite(dimensions, size=int(meteorite.meteorite_size/2), rng=rng)
+            smaller_meteorite.x, smaller_meteorite.y = meteorite.x, meteorite.y
+            smaller_meteorite.direction = meteorite.direction-90 if child == 1 else meteorite.direction+90
+
+            children.append(smaller_meteorite)
+
+    return children
@@ -0,0 +1,71 @@
+# Frame pacing. Instead of running the loop as fast as it goes, every frame waits for its deadline at the target
+# rate: it sleeps most of the way, since sleeping can overshoot by a millisecond or more, and spins on the clock
+# for the rest. Screens where nothing moves are paced at a much lower rate
+from collections import deque
+from math import ceil
+from statistics import fmean, pstdev
+from time import perf_counter, sleep
+
+from simulation import TICK_RATE
+
+
+class FramePacer:
+    # 'target_fps' 0 runs uncapped. With 'vsync' the flip waits for the display, so the pacer only measures and
+    # clamps. The elapsed time handed to the simulation is clamped to 'max_elapsed' units, so a stall doesn't
+    # move everything across the screen at once. The intervals of the last 'history' frames feed the jitter stats
+    def __init__(self, target_fps=60, idle_fps=10, vsync=False, spin_ms=2, max_elapsed=25.0, history=600):
+        self.target_fps  = target_fps
+        self.idle_fps    = idle_fps
+        self.vsync       = vsync
+        self.spin        = spin_ms / 1000
+        self.max_elapsed = max_elapsed
+
+        self.intervals = deque(maxlen=history)   # Seconds between the frames
+        self.missed    = 0                       # Frames that started after their deadline
+        self.last      = perf_counter()
+        self.deadline  = self.last
+
+    def wait(self, idle=False):
+        # Wait for the next frame and return the time since the last one in simulation units of 10 ms
+        fps = self.idle_fps if idle else self.target_fps
+        if fps and not (self.vsync and not idle):
+            interval = 1 / fps
+
+            # Catch up with the rate after a late frame instead of rushing through the missed deadlines
+            self.deadline += interval
+            now = perf_counter()
+            if now > self.deadline:
+                self.missed += 1
+                self.deadline = now
+            else:
+                if self.deadline - now > self.spin:
+                    sleep(self.deadline - now - self.spin)
+                while perf_counter() < self.deadline:
+                    pass
+
+        now = perf_counter()
+        elapsed, self.last = now - self.last, now
+        if not fps or self.vsync:
+            self.deadline = now
+        self.intervals.append(elapsed)
+
+        return min(elapsed * TICK_RATE, self.max_elapsed)
+
+    def fps(self):
+        recent = list(self.intervals)[-60:]
+        return len(recent) / sum(recent) if recent and sum(recent) else 0.0
+
+    def stats(self):
+        # Frame interval statistics in milliseconds, the jitter is the standard deviation of the intervals
+        if not self.intervals:
+            return {}
+
+        intervals = sorted(interval * 1000 for interval in self.intervals)
+        return {
+            "frames":    len(intervals),
+            "mean_ms":   fmean(intervals),
+            "jitter_ms": pstdev(intervals),
+            "p99_ms":    intervals[max(0, ceil(0.99 * len(intervals)) - 1)],
+            "max_ms":    intervals[-1],
+            "missed":    self.missed,
+        }
@@ -0,0 +1,142 @@
+from pygame.font import Font
+from pygame.draw import rect, line
+from pygame      import Surface, SRCALPHA
+
+from collections import deque
+from contextlib import contextmanager
+from json import dump
+from time import perf_counter_ns
+
+# Colors of the phases in the overlay, phases without a color of their own cycle through the rest
+PHASE_COLORS = [
+    (231, 76, 60), (241, 196, 15), (46, 204, 113), (52, 152, 219), (155, 89, 182),
+    (230, 126, 34), (26, 188, 156), (236, 240, 241), (149, 165, 166), (244, 143, 177),
+]
+
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class NullProfiler:
+    # Stands in for the profiler when profiling is off, every call is a no-op
+    show_overlay = False
+
+    @contextmanager
+    def phase(self, name: str):
+        yield
+
+    def begin_frame(self):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def count(self, name: str, amount=1):
+        pass
+
+    def draw_overlay(self, surface: Surface):
+        return None
+
+
+class FrameProfiler:
+    # Times the phases of every frame and counts things per frame, e.g. Surface allocations and entities.
+    # The last 'history' frames feed the on-screen overlay and the last 'trace_frames' frames can be exported
+    # as a Chrome trace, which opens in chrome://tracing or https://ui.perfetto.dev
+    def __init__(self, history=120, trace_frames=36000):
+        self.history      = deque(maxlen=history)        # {phase: milliseconds} per frame
+        self.trace        = deque(maxlen=trace_frames)   # (start, duration, [(phase, start, duration)], counters)
+        self.phase_names  = []                           # In the order they were first seen
+        self.show_overlay = False
+        self.origin       = perf_counter_ns()
+
+        self.frame_start, self.phases, self.counters = self.origin, [], {}
+        self.font = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start, perf_counter_ns() - start))
+
+    def begin_frame(self):
+        self.frame_start, self.phases, self.counters = perf_counter_ns(), [], {}
+
+    def count(self, name: str, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def end_frame(self):
+        duration = perf_counter_ns() - self.frame_start
+
+        frame = {}
+        for name, _, phase_duration in self.phases:
+            if name not in self.phase_names:
+                self.phase_names.append(name)
+            frame[name] = frame.get(name, 0) + phase_duration / 1e6
+
+        self.history.append(frame)
+        self.trace.append((self.frame_start, duration, self.phases, self.counters))
+
+    # Overlay -------------------------------------------------------
+
+    def draw_overlay(self, surface: Surface):
+        # A rolling stacked histogram of the phase times of the last frames, with a line at the 60 fps budget.
+        # Returns the rect of the overlay on the surface
+        if not self.show_overlay or not self.history:
+            return None
+
+        if self.font is None:
+            self.font = Font(None, 16)   # -> pygame.font.Font()
+
+        width, height, scale = 2 * self.history.maxlen, 100, 100 / (2 * FRAME_BUDGET_MS)
+        legend_height = 14 * len(self.phase_names) + 18
+        panel = Surface((width + 150, height + legend_height), SRCALPHA)   # -> pygame.Surface()
+        panel.fill((0, 0, 0, 180))
+
+        for x, frame in enumerate(self.history):
+            bottom = height
+            for i, name in enumerate(self.phase_names):
+                bar = frame.get(name, 0) * scale
+                if bar > 0:
+                    top = max(bottom - bar, 0)
+                    rect(panel, PHASE_COLORS[i % len(PHASE_COLORS)], (x * 2, top, 2, bottom - top))  # -> pygame.draw.rect()
+                    bottom = top
+
+        budget_y = height - FRAME_BUDGET_MS * scale
+        line(panel, (255, 255, 255), (0, budget_y), (width, budget_y))   # -> pygame.draw.line()
+
+        # Legend with the average and the worst time of every phase
+        frames = len(self.history)
+        for i, name in enumerate(self.phase_names):
+            times = [frame.get(name, 0) for frame in self.history]
+            text = f"{name} {sum(times) / frames:.2f} / {max(times):.2f} ms"
+            panel.blit(self.font.render(text, True, PHASE_COLORS[i % len(PHASE_COLORS)]), (4, height + 4 + 14 * i))
+
+        counters = ", ".join(f"{name} {amount}" for name, amount in self.trace[-1][3].items())
+        panel.blit(self.font.render(counters, True, (255, 255, 255)), (4, height + legend_height - 14))
+
+        return surface.blit(panel, (surface.get_width() - panel.get_width(), 0))
+
+    # Export --------------------------------------------------------
+
+    def export_chrome_trace(self, path):
+        # Chrome trace event format, the timestamps and durations are in microseconds
+        events = []
+        for frame_start, duration, phases, counters in self.trace:
+            events.append({
+                "name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                "ts": (frame_start - self.origin) / 1e3, "dur": duration / 1e3,
+            })
+            for name, start, phase_duration in phases:
+                events.append({
+                    "name": name, "ph": "X", "pid": 1, "tid": 1,
+                    "ts": (start - self.origin) / 1e3, "dur": phase_duration / 1e3,
+                })
+            if counters:
+                events.append({
+                    "name": "counters", "ph": "C", "pid": 1, "tid": 1,
+                    "ts": (frame_start - self.origin) / 1e3, "args": counters,
+                })
+
+        with open(path, "w") as trace_file:
+            dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
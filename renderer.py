@@ -0,0 +1,220 @@
+from pygame           import Surface, SRCALPHA
+from pygame.display   import flip, update
+from pygame.draw      import polygon, circle
+from pygame.transform import rotate
+
+from simulation   import Simulation, TICK_ELAPSED_TIME
+from sprite_cache import SpriteCache
+from profiler     import NullProfiler
+from text         import TextRenderer
+from assets       import Assets, EXPLOSION_FRAMES, EXPLOSION_SIZES
+from effects      import Explosions
+
+SPACESHIP_EXPLOSION_SIZE = 200
+
+
+class Renderer:
+    # Draws the state of a Simulation, or a Snapshot of one. The display has to be set before creating the renderer,
+    # since the images are converted to its pixel format when they are first drawn. The phases of drawing are timed
+    # with the given profiler.
+    # With 'dirty_rects' only the parts of the screen that changed are redrawn and pushed to the display: the background
+    # is restored under everything drawn on the last frame, and the screen is updated at the rects of both frames.
+    # Fades and frames where more than 'max_dirty' of the screen changed are still drawn and flipped whole
+    def __init__(self, display: Surface, profiler=None, assets=None, dirty_rects=False, max_dirty=0.5):
+        self.display  = display
+        self.profiler = profiler or NullProfiler()
+        self.assets   = assets or Assets()
+
+        self.dirty_rects = dirty_rects
+        self.max_dirty   = max_dirty * display.get_width() * display.get_height()
+        self.screen_rect = display.get_rect()
+        self.dirty       = []     # Rects drawn on this frame
+        self.previous    = None   # Rects drawn on the last frame, None when the whole screen has to be redrawn
+        self.full_frame  = True
+        self.faded       = False
+
+        # Reused for every frame of the fades, only its alpha changes
+        self.fade_effect = Surface(display.get_size())   # -> pygame.Surface()
+        self.fade_effect.fill((0, 0, 0))
+
+        # Rotated meteorite sprites are shared by every meteorite on the screen
+        self.sprite_cache = SpriteCache()
+
+        # Text ----------------------------------------------------------
+
+        # Fonts and rendered strings are cached, the numbers of the HUD are drawn from a digit atlas
+        self.text = TextRenderer()
+
+        self.game_over_text = self.text.render("Game Over", (255, 0, 0), 50)
+        self.game_over_text_rect = self.game_over_text.get_rect(center=(display.get_width() / 2, display.get_height() / 3))
+
+        self.replay_text      = self.text.render("Press ENTER to play again", (255, 255, 0), 20)
+        self.replay_text_rect = self.replay_text.get_rect(center=(display.get_width() / 2, display.get_height() / 2))
+
+        # Images --------------------------------------------------------
+
+        # The images are loaded on their first use. The explosions are drawn from sprite sheets of their frames,
+        # which are loaded right away instead of on the frame of the first explosion. They are kept by the assets,
+        # so renderers sharing them, e.g. the environments of a VectorEnv, load them only once
+        for size in EXPLOSION_SIZES:
+            self.assets.explosion_sheet(size)
+
+        # Effects -------------------------------------------------------
+
+        # Meteorites that are gone from one frame to the next were destroyed and explode where they were last drawn
+        self.explosions = Explosions(self.assets)
+        self.tracked    = {}   # Meteorite -> (x, y) on the last frame
+
+    def reset(self):
+        # Forget the last frame, e.g. before drawing another game
+        self.previous = None
+        self.forget_meteorites()
+        self.explosions.clear()
+
+    def forget_meteorites(self):
+        # The meteorites on the last frame won't be drawn again, neither will their outlines
+        for meteorite in self.tracked:
+            self.sprite_cache.forget(meteorite.shape_id)
+        self.tracked = {}
+
+    def draw(self, sim: Simulation, elapsed_time=TICK_ELAPSED_TIME):
+        # 'elapsed_time' since the last frame advances the effects
+        display, profiler = self.display, self.profiler
+        fading = self.faded = sim.fade_in or sim.fade_out
+
+        self.dirty      = []
+        self.full_frame = not self.dirty_rects or fading or self.previous is None or \
+            sum(rect.width * rect.height for rect in self.previous) > self.max_dirty
+
+        with profiler.phase("background"):
+            background = self.assets.image("background")
+            if self.full_frame:
+                display.fill((0, 0, 0))
+                display.blit(background, (0, 0))
+            else:
+                # Restore the background under everything that was drawn on the last frame
+                display.blits([(background, rect, rect) for rect in self.previous], False)   # -> pygame.Surface.blits()
+
+        if not sim.hide_game:
+            with profiler.phase("meteorites"):
+                self.draw_meteorites(sim)
+            with profiler.phase("explosions"):
+                self.explosions.update(elapsed_time)
+                self.dirty.extend(self.explosions.draw(display))
+            with profiler.phase("spaceship"):
+                self.draw_spaceship(sim)
+            with profiler.phase("bullets"):
+                self.draw_bullets(sim)
+            with profiler.phase("hud"):
+                self.draw_hud(sim)
+        else:
+            with profiler.phase("game over"):
+                self.draw_game_over(sim)
+
+            # A new game starts with new meteorites, the old ones didn't explode
+            self.forget_meteorites()
+            self.explosions.clear()
+
+        # Effects ---------------------------------------------------
+
+        if fading:
+            with profiler.phase("fade"):
+                self.fade_effect.set_alpha(sim.fade_alpha)
+                display.blit(self.fade_effect, (0, 0))
+
+        profiler.count("meteorites", sim.meteorite_count)
+        profiler.count("bullets", sim.bullet_count)
+        profiler.count("explosions", len(self.explosions))
+
+    def present(self, *rects):
+        # Push the frame to the display. 'rects' are the rects of anything drawn on top of the frame after 'draw()'
+        self.dirty.extend(rect for rect in rects if rect is not None)
+
+        if self.full_frame:
+            flip()   # -> pygame.display.flip()
+        else:
+            update(self.previous + self.dirty)   # -> pygame.display.update()
+
+        # The fade covers the whole screen, so the frame after it is redrawn whole as well
+        self.previous = None if self.faded else [rect.clip(self.screen_rect) for rect in self.dirty]
+        self.profiler.count("dirty rects", 0 if self.full_frame else len(self.previous))
+
+    def draw_meteorites(self, sim: Simulation):
+        # The outlines are drawn and rotated only once per quantized angle, after that the sprites are reused
+        cache = self.sprite_cache
+        sprites, tracked, misses = [], {}, cache.misses + cache.outline_misses
+        for meteorite, x, y, rotation in sim.iter_meteorites():
+            sprite = cache.get(meteorite.shape_id, meteorite.points, meteorite.meteorite_size, rotation)
+            sprites.append((sprite, sprite.get_rect(center=(x, y))))
+            tracked[meteorite] = (x, y)
+
+        self.dirty.extend(self.display.blits(sprites))   # -> pygame.Surface.blits()
+        self.profiler.count("surfaces", cache.misses + cache.outline_misses - misses)
+
+        for meteorite, (x, y) in self.tracked.items():
+            if meteorite not in tracked:
+                self.explosions.spawn(x, y, meteorite.meteorite_size)
+                cache.forget(meteorite.shape_id)
+        self.tracked = tracked
+
+    def draw_spaceship(self, sim: Simulation):
+        if not sim.spaceship_destroyed:
+            spaceship_container = Surface((30, 35), SRCALPHA)   # -> pygame.Surface()
+            container_dimensions = spaceship_container.get_size()
+            polygon(spaceship_container, (255, 255, 255), (     # -> pygame.draw.polygon()
+                (container_dimensions[0] / 2, (container_dimensions[1] / 2) - 15),
+                ((container_dimensions[0] / 2) + 10, (container_dimensions[1] / 2) + 10),
+                ((container_dimensions[0] / 2) - 10, (container_dimensions[1] / 2) + 10)
+            ), 2)
+
+            spaceship_container = rotate(spaceship_container, sim.spaceship_rotation)
+            spaceship_container_rect = spaceship_container.get_rect(center=sim.spaceship_location)
+            self.dirty.append(self.display.blit(spaceship_container, spaceship_container_rect))
+            self.profiler.count("surfaces", 2)
+
+        elif sim.explosion_frame < EXPLOSION_FRAMES:
+            sheet, areas = self.assets.explosion_sheet(SPACESHIP_EXPLOSION_SIZE)
+            x, y = sim.spaceship_location
+            half = SPACESHIP_EXPLOSION_SIZE / 2
+            self.dirty.append(self.display.blit(sheet, (x - half, y - half), areas[int(sim.explosion_frame)]))
+
+    def draw_bullets(self, sim: Simulation):
+        display, dirty = self.display, self.dirty
+        for bullet_location in sim.iter_bullets():
+            dirty.append(circle(display, (255, 255, 255), bullet_location, 3))   # -> pygame.draw.circle()
+
+    def draw_hud(self, sim: Simulation):
+        display, dirty = self.display, self.dirty
+
+        heart_image = self.assets.image("heart")
+        for heart in range(0, sim.lives_remaining):
+            dirty.append(display.blit(
+                heart_image, (heart_image.get_width()*heart, display.get_height()-heart_image.get_height())
+            ))
+
+        score_text_color = (255, 255, 0) if sim.new_high_score else (255, 255, 255)
+
+        misses = self.text.misses
+        score_text_rect = self.text.draw_number(display, sim.score, score_text_color, 22, (10, 0), prefix="score: ")
+        dirty.append(score_text_rect)
+        dirty.append(self.text.draw_number(display, sim.wave, (255, 255, 255), 22, (10, 25), prefix="wave: "))
+
+        dirty.append(display.blit(self.assets.image("trophy"), (score_text_rect.width + 50, 10)))
+        dirty.append(self.text.draw_number(display, sim.high_score, (255, 255, 0), 22, (score_text_rect.width + 75, 0)))
+        self.profiler.count("surfaces", self.text.misses - misses)
+
+    def draw_game_over(self, sim: Simulation):
+        display = self.display
+
+        misses = self.text.misses
+        if sim.new_high_score:
+            score_text = self.text.render(f"new high score! {sim.score}", (255, 255, 255), 30)
+        else:
+            score_text = self.text.render(f"score {sim.score}", (255, 255, 255), 30)
+
+        score_text_rect = score_text.get_rect(center=(display.get_width() / 2, (display.get_height() / 3) + 60))
+
+        self.dirty.append(display.blit(self.game_over_text, self.game_over_text_rect))
+        self.dirty.append(display.blit(score_text, score_text_rect))
+        self.dirty.append(display.blit(self.replay_text, self.replay_text_rect))
+        self.profiler.count("surfaces", self.text.misses - misses)
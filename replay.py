@@ -0,0 +1,87 @@
+from argparse import ArgumentParser
+from struct import Struct
+from time import perf_counter
+from zlib import compress, decompress
+
+from simulation import Simulation, Inputs, TICK_RATE, TICK_ELAPSED_TIME, MAX_SEED
+
+# A replay file is a fixed size header followed by the zlib compressed inputs, one byte per tick.
+# Each bit of the byte is one of the fields of 'Inputs', so held keys compress into long runs of equal bytes
+MAGIC, VERSION = b"MTRP", 3   # Version 3: bullet paths reaching into the next grid cell hit what they touch
+HEADER         = Struct("<4sBBHQI")   # magic, version, flags, tick rate, seed, ticks
+ARRAY_WORLD    = 1                    # Header flag, the game was played with the array backed world
+
+# Every possible input byte, unpacked once
+INPUTS = [Inputs(*(bool(bits & (1 << field)) for field in range(len(Inputs._fields)))) for bits in range(1 << len(Inputs._fields))]
+
+
+def pack_inputs(inputs: Inputs):
+    bits = 0
+    for field, pressed in enumerate(inputs):
+        if pressed:
+            bits |= 1 << field
+    return bits
+
+
+class Replay:
+    def __init__(self, seed: int, array_world=False, ticks=b""):
+        # The seed is checked up front, so a game isn't played to the end only to fail saving its replay
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"the seed of a replay must be between 0 and {MAX_SEED}, not {seed}")
+
+        self.seed        = seed
+        self.array_world = array_world
+        self.ticks       = bytearray(ticks)
+
+    def record(self, inputs: Inputs):
+        self.ticks.append(pack_inputs(inputs))
+
+    def inputs(self):
+        return (INPUTS[bits] for bits in self.ticks)
+
+    def save(self, path):
+        flags = ARRAY_WORLD if self.array_world else 0
+        with open(path, "wb") as replay_file:
+            replay_file.write(HEADER.pack(MAGIC, VERSION, flags, TICK_RATE, self.seed, len(self.ticks)))
+            replay_file.write(compress(bytes(self.ticks), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as replay_file:
+            data = replay_file.read()
+
+        magic, version, flags, tick_rate, seed, tick_count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Meteorites replay")
+        if tick_rate != TICK_RATE:
+            raise ValueError(f"{path} was recorded at {tick_rate} ticks per second, expected {TICK_RATE}")
+
+        ticks = decompress(data[HEADER.size:])
+        if len(ticks) != tick_count:
+            raise ValueError(f"{path} is truncated, expected {tick_count} ticks but found {len(ticks)}")
+
+        return cls(seed, bool(flags & ARRAY_WORLD), ticks)
+
+    def play(self, dimensions=(800, 800)):
+        # Fast forward through the replay without rendering anything and return the final state of the game
+        sim = Simulation(dimensions, array_world=self.array_world, seed=self.seed)
+        for inputs in self.inputs():
+            sim.step(inputs, TICK_ELAPSED_TIME)
+        return sim
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Fast forward through a recorded Meteorites game")
+    parser.add_argument("replay", help="replay file written by 'main.py --record'")
+    arguments = parser.parse_args()
+
+    replay = Replay.load(arguments.replay)
+
+    start = perf_counter()
+    sim = replay.play()
+    duration = perf_counter() - start
+
+    game_time = len(replay.ticks) / TICK_RATE
+    print(f"seed {replay.seed}, {len(replay.ticks)} ticks ({game_time:.1f} s of play)")
+    print(f"wave {sim.wave}, score {sim.score}, lives {sim.lives_remaining}, game over {sim.game_over}")
+    print(f"replayed in {duration:.2f} s, {game_time / duration if duration else float('inf'):.0f}x real time")
@@ -0,0 +1,195 @@
+# Runs the simulation on its own thread at the fixed tick rate, so a slow frame never holds back the physics or the
+# input handling. After every tick the thread publishes an immutable snapshot of the game, and the render thread draws
+# an interpolation between the last two of them
+from math import sin, cos, radians
+from queue import SimpleQueue, Empty
+from threading import Thread, Lock, Event
+from time import perf_counter, sleep
+from typing import NamedTuple
+
+from simulation import Simulation, Inputs, TICK_RATE, TICK_ELAPSED_TIME, BULLET_SPEED, \
+    MAX_CATCH_UP_TICKS
+
+# Entities that moved further than this in one tick wrapped around the screen and are not interpolated
+MAX_INTERPOLATED_DISTANCE = 100
+
+
+class Snapshot(NamedTuple):
+    # Everything the renderer reads from a Simulation, copied after a tick. The Meteorite objects are shared with the
+    # simulation, but only their outline, size and shape id are read from them, and those never change
+    fade_in:             bool
+    fade_out:            bool
+    fade_alpha:          float
+    hide_game:           bool
+    spaceship_location:  tuple
+    spaceship_rotation:  float
+    spaceship_destroyed: bool
+    explosion_frame:     float
+    lives_remaining:     int
+    score:               int
+    wave:                int
+    high_score:          int
+    new_high_score:      bool
+    meteorites:          tuple   # (meteorite, x, y, rotation)
+    bullets:             tuple   # (x, y, step x, step y), the step is the movement per elapsed time unit
+
+    @classmethod
+    def capture(cls, sim: Simulation):
+        world = sim.world
+        if world is not None:
+            n = world.bullet_count
+            bullets = tuple(zip(world.b_x[:n].tolist(), world.b_y[:n].tolist(),
+                                world.b_step_x[:n].tolist(), world.b_step_y[:n].tolist()))
+        else:
+            bullets = tuple(
+                (x, y, sin(radians(direction)) * -BULLET_SPEED, cos(radians(direction)) * -BULLET_SPEED)
+                for (x, y), direction in sim.bullets
+            )
+
+        return cls(
+            sim.fade_in, sim.fade_out, sim.fade_alpha, sim.hide_game,
+            sim.spaceship_location, sim.spaceship_rotation, sim.spaceship_destroyed, sim.explosion_frame,
+            sim.lives_remaining, sim.score, sim.wave, sim.high_score, sim.new_high_score,
+            tuple(sim.iter_meteorites()), bullets,
+        )
+
+    # The same reading interface as Simulation -----------------------
+
+    @property
+    def meteorite_count(self):
+        return len(self.meteorites)
+
+    @property
+    def bullet_count(self):
+        return len(self.bullets)
+
+    def iter_meteorites(self):
+        return iter(self.meteorites)
+
+    def iter_bullets(self):
+        return ((x, y) for x, y, _, _ in self.bullets)
+
+    # Interpolation -------------------------------------------------
+
+    def interpolate(self, previous, alpha: float):
+        # The state 'alpha' of the way from the previous snapshot to this one. Meteorites are matched between the
+        # snapshots by their object, new ones and ones that wrapped around the screen are drawn where they are now.
+        # Bullets are moved back along their step, since that is all they did during the tick
+        if previous is None or alpha >= 1:
+            return self
+
+        def blend(before, after):
+            return before + (after - before) * alpha
+
+        def blend_angle(before, after, period=359):
+            return (before + ((after - before + period / 2) % period - period / 2) * alpha) % period
+
+        def near(x, y, previous_x, previous_y):
+            return abs(x - previous_x) < MAX_INTERPOLATED_DISTANCE and abs(y - previous_y) < MAX_INTERPOLATED_DISTANCE
+
+        previous_meteorites = {meteorite: (x, y, rotation) for meteorite, x, y, rotation in previous.meteorites}
+        meteorites = []
+        for meteorite, x, y, rotation in self.meteorites:
+            before = previous_meteorites.get(meteorite)
+            if before is not None and near(x, y, before[0], before[1]):
+                x, y, rotation = blend(before[0], x), blend(before[1], y), blend_angle(before[2], rotation)
+            meteorites.append((meteorite, x, y, rotation))
+
+        back = (1 - alpha) * TICK_ELAPSED_TIME
+        bullets = tuple((x - step_x * back, y - step_y * back, step_x, step_y) for x, y, step_x, step_y in self.bullets)
+
+        (x, y), (previous_x, previous_y) = self.spaceship_location, previous.spaceship_location
+        spaceship_location, spaceship_rotation = self.spaceship_location, self.spaceship_rotation
+        if near(x, y, previous_x, previous_y):
+            spaceship_location = (blend(previous_x, x), blend(previous_y, y))
+            spaceship_rotation = blend_angle(previous.spaceship_rotation, self.spaceship_rotation)
+
+        explosion_frame = self.explosion_frame
+        if explosion_frame >= previous.explosion_frame:
+            explosion_frame = blend(previous.explosion_frame, explosion_frame)
+
+        return self._replace(
+            fade_alpha=blend(previous.fade_alpha, self.fade_alpha),
+            spaceship_location=spaceship_location,
+            spaceship_rotation=spaceship_rotation,
+            explosion_frame=explosion_frame,
+            meteorites=tuple(meteorites),
+            bullets=bullets,
+        )
+
+
+class SimulationThread(Thread):
+    # Steps the simulation TICK_RATE times per second with the latest inputs and publishes (previous, current, time)
+    # as one tuple, which the render thread picks up whole. The events of the ticks are queued for the render thread,
+    # e.g. for the sounds, and every tick is recorded into 'replay' if one is given.
+    # The simulation must not be touched by other threads while this one runs
+    def __init__(self, sim: Simulation, replay=None):
+        super().__init__(name="simulation", daemon=True)
+        self.sim, self.replay = sim, replay
+
+        self.events  = SimpleQueue()
+        self.stopped = Event()
+
+        # The held keys are replaced whole, the presses are collected until a tick takes them
+        self.held, self.presses, self.presses_lock = Inputs(), (False, False), Lock()
+
+        self.snapshots = (None, Snapshot.capture(sim), perf_counter())
+        self.ticks     = 0
+
+    def set_inputs(self, inputs: Inputs):
+        self.held = inputs._replace(shoot=False, restart=False)
+        if inputs.shoot or inputs.restart:
+            with self.presses_lock:
+                self.presses = (self.presses[0] or inputs.shoot, self.presses[1] or inputs.restart)
+
+    def take_events(self):
+        # Every event of the ticks since the last call, in order
+        events = []
+        while True:
+            try:
+                events.extend(self.events.get_nowait())
+            except Empty:
+                return events
+
+    def interpolated(self):
+        # The state of the game as of one tick ago, so there is always a newer snapshot to interpolate towards
+        previous, current, published = self.snapshots
+        return current.interpolate(previous, (perf_counter() - published) * TICK_RATE)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def run(self):
+        tick_duration = 1 / TICK_RATE
+        next_tick     = perf_counter() + tick_duration
+
+        while not self.stopped.is_set():
+            now = perf_counter()
+            if now < next_tick:
+                sleep(next_tick - now)
+                continue
+
+            # After a stall, drop the ticks that can't be caught up instead of snowballing
+            behind = int((now - next_tick) / tick_duration) + 1
+            if behind > MAX_CATCH_UP_TICKS:
+                next_tick += (behind - MAX_CATCH_UP_TICKS) * tick_duration
+                behind = MAX_CATCH_UP_TICKS
+
+            for _ in range(behind):
+                self.tick()
+            next_tick += behind * tick_duration
+
+    def tick(self):
+        with self.presses_lock:
+            (shoot, restart), self.presses = self.presses, (False, False)
+        inputs = self.held._replace(shoot=shoot, restart=restart)
+
+        events = self.sim.step(inputs, TICK_ELAPSED_TIME)
+        if self.replay is not None:
+            self.replay.record(inputs)
+        if events:
+            self.events.put(events)
+
+        self.ticks += 1
+        self.snapshots = (self.snapshots[1], Snapshot.capture(self.sim), perf_counter())
@@ -0,0 +1,340 @@
+from math import sin, cos, radians
+from random import Random
+from typing import NamedTuple
+
+from meteorite  import Meteorite, split_meteorite
+from broadphase import SpatialHash
+from world      import EntityWorld
+
+# The elapsed time is measured in units of 10 ms, so in the fixed timestep mode the simulation runs at 100 ticks
+# per second and every tick advances it by one unit
+TICK_RATE, TICK_ELAPSED_TIME = 100, 1.0
+
+# At most this many ticks are caught up at once after a stall, by the fixed timestep game loop and the simulation
+# thread alike, so a long stall doesn't snowball
+MAX_CATCH_UP_TICKS = 25
+
+# Seeds are saved as unsigned 64-bit integers, e.g. in replays
+MAX_SEED = 2 ** 64 - 1
+
+# Headless games still running after ten minutes of play are cut off, e.g. in batch runs and training environments
+MAX_TICKS = 10 * 60 * TICK_RATE
+
+# Corners of the spaceship around its center before it is rotated, as the renderer draws it
+SPACESHIP_HULL   = ((0, -15), (10, 10), (-10, 10))
+SPACESHIP_RADIUS = 15
+
+BULLET_SPEED = 8
+
+# Events a step can emit, the renderer and the audio react to these
+SHOOT, SPACESHIP_DESTROYED, METEORITE_DESTROYED, GAME_OVER, RESTART = \
+    "shoot", "spaceship_destroyed", "meteorite_destroyed", "game_over", "restart"
+
+
+class Inputs(NamedTuple):
+    up:      bool = False   # Held keys
+    down:    bool = False
+    left:    bool = False
+    right:   bool = False
+    shoot:   bool = False   # SPACE was pressed during the step
+    restart: bool = False   # ENTER was pressed during the step
+
+
+class Simulation:
+    # The rules of the game: spaceship physics, meteorite spawning and splitting, scoring, waves, lives and the
+    # fades between games. Nothing here touches pygame, so the game can be stepped without a display or a mixer.
+    # Every game draws from its own random number generator, so a seed and the inputs of each step reproduce it
+    def __init__(self, dimensions=(800, 800), high_score=0, array_world=False, seed=None):
+        self.dimensions = self.width, self.height = dimensions
+        self.seed       = seed
+        self.rng        = Random(seed)
+        self.grid       = SpatialHash()
+
+        # With the array backed world, the meteorites and bullets are stored in NumPy arrays and moved all at once
+        self.world = EntityWorld(dimensions) if array_world else None
+
+        self.high_score = high_score
+        self.events     = []
+
+        self.reset()
+
+        # Fade the game in on start
+        self.fade_in, self.fade_out, self.fade_alpha = True, False, 255
+
+    def reset(self):
+        self.spaceship_location  = (self.width / 2, self.height / 2)
+        self.spaceship_speed     = 0
+        self.spaceship_rotation  = 0
+        self.spaceship_destroyed = False
+        self.bullets             = []   # ((x, y), direction)
+
+        self.meteorites = []
+        if self.world is not None:
+            self.world.clear_bullets()
+            self.world.clear_meteorites()
+        self.spawn_meteorites(3)
+
+        self.explosion_frame, self.wave, self.score, self.lives_remaining = 0, 1, 0, 3
+        self.new_high_score = False
+
+        # Stop displaying the game after the game has ended and the fade has faded out
+        self.game_over, self.hide_game = False, False
+
+    # State ---------------------------------------------------------
+
+    @property
+    def meteorite_count(self):
+        return self.world.meteorite_count if self.world is not None else len(self.meteorites)
+
+    @property
+    def bullet_count(self):
+        return self.world.bullet_count if self.world is not None else len(self.bullets)
+
+    def iter_meteorites(self):
+        # (meteorite, x, y, rotation) for every meteorite, whichever way they are stored
+        if self.world is not None:
+            n = self.world.meteorite_count
+            return zip(self.world.meteorites,
+                       self.world.m_x[:n].tolist(), self.world.m_y[:n].tolist(), self.world.m_rotation[:n].tolist())
+
+        return ((meteorite, meteorite.x, meteorite.y, meteorite.meteorite_rotation) for meteorite in self.meteorites)
+
+    def iter_bullets(self):
+        # (x, y) for every bullet
+        if self.world is not None:
+            n = self.world.bullet_count
+            return zip(self.world.b_x[:n].tolist(), self.world.b_y[:n].tolist())
+
+        return (bullet_location for bullet_location, _ in self.bullets)
+
+    # Step ----------------------------------------------------------
+
+    def step(self, inputs: Inputs, elapsed_time: float):
+        self.events = []
+
+        if not self.hide_game:
+            self.update_meteorites(elapsed_time)
+            self.update_spaceship_explosion(elapsed_time)
+            self.update_bullets(elapsed_time)
+
+            if not self.game_over:
+                self.move_spaceship(inputs, elapsed_time)
+
+        # Shoot
+        if inputs.shoot and not self.spaceship_destroyed and not self.game_over:
+            self.events.append(SHOOT)
+            if self.world is not None:
+                self.world.add_bullet(self.spaceship_location, self.spaceship_rotation, BULLET_SPEED)
+            else:
+                self.bullets.append((self.spaceship_location, self.spaceship_rotation))
+
+        # Replay
+        if inputs.restart and self.hide_game and self.game_over:
+            self.events.append(RESTART)
+            self.reset()
+            self.fade_in, self.fade_out, self.fade_alpha = True, False, 255
+
+        self.update_fade(elapsed_time)
+        return self.events
+
+    def update_meteorites(self, elapsed_time: float):
+        world = self.world
+
+        if self.meteorite_count == 0:
+            self.wave += 1
+            self.spawn_meteorites(3 + self.wave)
+
+        if world is not None:
+            world.move_meteorites(elapsed_time)
+            near = [] if self.spaceship_destroyed else world.meteorites_near(self.spaceship_location, SPACESHIP_RADIUS)
+            if near:
+                hull = self.spaceship_hull()
+                hit  = any(world.meteorite(meteorite).collide_polygon(hull) for meteorite in near)
+            else:
+                hit = False
+
+        else:
+            for meteorite in self.meteorites:
+                meteorite.move(self.dimensions, elapsed_time)
+
+            # Sort the meteorites into the broadphase grid, only the meteorites sharing a cell with
+            # the spaceship or a bullet need the outline test. They are widened by the path of a bullet
+            # in this step, so a bullet finds what its path touches in the cell the path starts in
+            self.grid.rebuild(
+                [meteorite.x for meteorite in self.meteorites],
+                [meteorite.y for meteorite in self.meteorites],
+                [meteorite.bounding_radius for meteorite in self.meteorites],
+                BULLET_SPEED * elapsed_time,
+            )
+
+            hit = False
+            if not self.spaceship_destroyed:
+                near = self.grid.candidates_near(*self.spaceship_location, SPACESHIP_RADIUS)
+                if near:
+                    hull = self.spaceship_hull()
+                    hit  = any(self.meteorites[meteorite].collide_polygon(hull) for meteorite in near)
+
+        # Check if the spaceship collides with a meteorite
+        if hit:
+            self.lives_remaining     -= 1
+            self.spaceship_destroyed = True
+            self.events.append(SPACESHIP_DESTROYED)
+
+    def spaceship_hull(self):
+        # The corners of the spaceship on the screen, turned counterclockwise by its rotation like its sprite
+        angle = radians(self.spaceship_rotation)
+        cos_angle, sin_angle = cos(angle), sin(angle)
+        x, y = self.spaceship_location
+        return [
+            (x + corner_x * cos_angle + corner_y * sin_angle, y - corner_x * sin_angle + corner_y * cos_angle)
+            for corner_x, corner_y in SPACESHIP_HULL
+        ]
+
+    def spawn_meteorites(self, amount: int):
+        meteorites = [Meteorite(self.dimensions, rng=self.rng) for _ in range(amount)]
+        if self.world is not None:
+            self.world.add_meteorites(meteorites)
+        else:
+            self.meteorites = meteorites
+
+    def update_spaceship_explosion(self, elapsed_time: float):
+        if not self.spaceship_destroyed:
+            return
+
+        self.explosion_frame += 0.2*elapsed_time
+
+        # Wait until the frame is 40 to add a little delay for the respawn
+        if self.explosion_frame > 40:
+            # Respawn the spaceship if it has lives remaining
+            if self.lives_remaining > 0:
+                self.explosion_frame                             = 0
+                self.spaceship_location, self.spaceship_rotation = (self.width/2, self.height/2), 0
+                self.spaceship_destroyed                         = False
+            elif not self.game_over:
+                self.game_over = True
+                self.events.append(GAME_OVER)
+
+                # Fade the game out
+                self.fade_out, self.fade_alpha = True, 0
+
+    def update_bullets(self, elapsed_time: float):
+        world = self.world
+
+        if world is not None:
+            # Every hit is collected first and removed afterwards, so no bullet or meteorite gets skipped
+            hit_bullets, hit_meteorites = world.bullet_hits(elapsed_time)
+            for meteorite in hit_meteorites:
+                meteorite = world.meteorite(meteorite)
+                world.add_meteorites(split_meteorite(self.dimensions, meteorite, self.rng))
+                self.add_score(meteorite)
+
+            if hit_meteorites:
+                world.remove_bullets(hit_bullets)
+                world.remove_meteorites(hit_meteorites)
+
+            world.move_bullets(elapsed_time)
+            world.expire_bullets()
+            return
+
+        # Check if the bullets are in the screen, otherwise remove them
+        bullets = [
+            bullet for bullet in self.bullets
+            if self.width > bullet[0][0] > 0 and self.height > bullet[0][1] > 0
+        ]
+
+        # Where the bullets end up after this step, computed once per bullet
+        step = (BULLET_SPEED * -1) * elapsed_time
+        ends = [
+            (bullet_x + sin(radians(direction)) * step, bullet_y + cos(radians(direction)) * step)
+            for (bullet_x, bullet_y), direction in bullets
+        ]
+
+        # Every hit is collected first and removed afterwards, so no bullet or meteorite gets skipped.
+        # A bullet hits what its path of this step touches, so it can't skip over the thin parts of a meteorite
+        meteorites = self.meteorites
+
+        # The path is never further than its length from its end, so most candidates are ruled out right here
+        reach = BULLET_SPEED * elapsed_time
+
+        def collide(meteorite, bullet):
+            meteorite, (end_x, end_y) = meteorites[meteorite], ends[bullet]
+            x, y, limit = end_x - meteorite.x, end_y - meteorite.y, meteorite.bounding_radius + reach
+            return x * x + y * y < limit * limit and meteorite.collide_segment(bullets[bullet][0], ends[bullet])
+
+        hit_bullets, hit_meteorites = self.grid.hits([bullet_location for bullet_location, _ in bullets], collide)
+
+        if hit_meteorites:
+            for meteorite in hit_meteorites:
+                meteorites.extend(split_meteorite(self.dimensions, meteorites[meteorite], self.rng))
+                self.add_score(meteorites[meteorite])
+
+            # If a bullet hits a meteorite, remove the bullet and the destroyed meteorite
+            hit_bullets, hit_meteorites = set(hit_bullets), set(hit_meteorites)
+            bullets         = [bullet for i, bullet in enumerate(bullets) if i not in hit_bullets]
+            ends            = [end for i, end in enumerate(ends) if i not in hit_bullets]
+            self.meteorites = [meteorite for i, meteorite in enumerate(meteorites) if i not in hit_meteorites]
+
+        # Move the bullets in their angle
+        self.bullets = [(end, direction) for end, (_, direction) in zip(ends, bullets)]
+
+    def add_score(self, meteorite: Meteorite):
+        self.events.append(METEORITE_DESTROYED)
+
+        self.score += meteorite.meteorite_size * self.wave
+        if self.score > self.high_score:
+            self.new_high_score = True
+            self.high_score = self.score
+
+    def move_spaceship(self, inputs: Inputs, elapsed_time: float):
+        if not self.spaceship_destroyed:
+            # Add acceleration effect to the spaceship movement
+            if inputs.up:
+                if self.spaceship_speed < 5:
+                    self.spaceship_speed += 0.05 * elapsed_time
+            elif inputs.down:
+                if self.spaceship_speed > -5:
+                    self.spaceship_speed -= 0.05 * elapsed_time
+
+            # Add sliding effect to the spaceship movement
+            else:
+                if self.spaceship_speed >= 0.2:
+                    self.spaceship_speed -= 0.02 * elapsed_time
+                elif self.spaceship_speed <= -0.02:
+                    self.spaceship_speed += 0.02 * elapsed_time
+                else:
+                    self.spaceship_speed = 0
+        else:
+            self.spaceship_speed = 0
+
+        # Rotate the spaceship
+        if inputs.left:
+            self.spaceship_rotation += 3 * elapsed_time
+        elif inputs.right:
+            self.spaceship_rotation -= 3 * elapsed_time
+
+        # Keep the rotation in the range of 360 to avoid possible overflow
+        self.spaceship_rotation = self.spaceship_rotation % 359
+
+        # Move the spaceship in the current angle
+        x, y = self.spaceship_location
+        self.spaceship_location = (
+            (x + sin(radians(self.spaceship_rotation)) * ((self.spaceship_speed*-1) * elapsed_time)) % self.width,
+            (y + cos(radians(self.spaceship_rotation)) * ((self.spaceship_speed*-1) * elapsed_time)) % self.height,
+        )
+
+    def update_fade(self, elapsed_time: float):
+        if self.fade_in:
+            if self.fade_alpha > 0:
+                self.fade_alpha -= 2 * elapsed_time
+            else:
+                self.fade_in = False
+        elif self.fade_out:
+            if self.fade_alpha < 255:
+                self.fade_alpha += 2 * elapsed_time
+            else:
+                self.fade_out = False
+                if self.game_over:
+                    self.hide_game = True
+                    self.fade_in, self.fade_alpha = True, 255
+
+        self.fade_alpha = min(max(self.fade_alpha, 0), 255)
@@ -0,0 +1,82 @@
+from pygame           import Surface, SRCALPHA
+from pygame.draw      import polygon
+from pygame.transform import rotate
+
+from collections import OrderedDict
+
+
+class SpriteCache:
+    # Rasterizes each meteorite outline once and keeps its rotated variants at quantized angles.
+    # The rotated sprites are bounded by their pixel memory and the least recently used one is evicted first.
+    # The unrotated outlines are kept apart from them until 'forget()' is called for their shape, e.g. when the
+    # meteorite is destroyed, so an outline is never evicted and rasterized again while its meteorite is alive.
+    # A meteorite only comes back to an angle after a whole turn, so the sprites in use are about one per meteorite,
+    # and the default size holds that for 500 big meteorites, well over a late wave. A bigger cache hits no more often
+    def __init__(self, angle_step=3, max_bytes=64 * 1024 * 1024):
+        self.angle_step = angle_step
+        self.steps      = int(360 / angle_step)
+        self.max_bytes  = max_bytes
+        self.bytes_used = 0
+
+        self.hits, self.misses, self.evictions, self.outline_misses = 0, 0, 0, 0
+
+        self.entries  = OrderedDict()   # (shape_id, angle_index) -> Surface
+        self.outlines = {}              # shape_id -> Surface
+
+    def get(self, shape_id: int, points, size: int, angle: float, color=(255, 255, 0), width=3):
+        angle_index = int(round(angle / self.angle_step)) % self.steps
+        key = (shape_id, angle_index)
+
+        sprite = self.entries.get(key)
+        if sprite is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = rotate(self.outline(shape_id, points, size, color, width), angle_index * self.angle_step)
+        # ^ pygame.transform.rotate()
+        self.store(key, sprite)
+        return sprite
+
+    def outline(self, shape_id: int, points, size: int, color, width):
+        outline = self.outlines.get(shape_id)
+        if outline is None:
+            self.outline_misses += 1
+            outline = self.outlines[shape_id] = Surface((size, size), SRCALPHA)  # -> pygame.Surface()
+            polygon(outline, color, points, width)                                # -> pygame.draw.polygon()
+        return outline
+
+    def forget(self, shape_id: int):
+        # Drop the outline of a shape that won't be drawn again, its rotated sprites fall out of the cache on their own
+        self.outlines.pop(shape_id, None)
+
+    def store(self, key, sprite: Surface):
+        self.entries[key] = sprite
+        self.bytes_used += sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+
+        while self.bytes_used > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes_used -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+            self.evictions  += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.outlines.clear()
+        self.bytes_used = 0
+        self.hits, self.misses, self.evictions, self.outline_misses = 0, 0, 0, 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits":           self.hits,
+            "misses":         self.misses,
+            "evictions":      self.evictions,
+            "outline_misses": self.outline_misses,
+            "entries":        len(self.entries),
+            "outlines":       len(self.outlines),
+            "bytes":          self.bytes_used,
+            "outline_bytes":  sum(outline.get_width() * outline.get_height() * outline.get_bytesize()
+                                  for outline in self.outlines.values()),
+            "hit_rate":       self.hits / lookups if lookups else 0.0,
+        }
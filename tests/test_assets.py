@@ -0,0 +1,63 @@
+from os import environ, utime
+from shutil import copyfile
+
+import pytest
+
+environ.setdefault("SDL_VIDEODRIVER", "dummy")
+from pygame.display import init as display_init, set_mode, quit as display_quit
+
+import assets
+from assets import Assets, build, EXPLOSION_FRAMES
+
+
+@pytest.fixture
+def display():
+    display_init()              # -> pygame.display.init()
+    yield set_mode((1, 1))      # -> pygame.display.set_mode()
+    display_quit()
+
+
+@pytest.fixture
+def heart(tmp_path, monkeypatch):
+    # Pack only a copy of the heart, so the test can change its source file
+    source = tmp_path / "heart.png"
+    copyfile("lib/images/heart.png", source)
+    monkeypatch.setattr(assets, "IMAGES", {"heart": (str(source), (40, 40), True)})
+    monkeypatch.setattr(assets, "SOUNDS", {})
+    monkeypatch.setattr(assets, "EXPLOSION_SIZES", ())
+    build(tmp_path / "assets.pack")
+    return source
+
+
+def test_packed_asset_is_used(display, heart, tmp_path):
+    pack = Assets(tmp_path / "assets.pack")
+    assert pack.packed_entry("heart") is not None
+    assert pack.image("heart").get_size() == (40, 40)
+
+
+def test_changed_source_is_loaded_instead_of_the_pack(display, heart, tmp_path):
+    stat = heart.stat()
+    utime(heart, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    pack = Assets(tmp_path / "assets.pack")
+    assert pack.packed
+    assert pack.packed_entry("heart") is None
+    assert pack.image("heart").get_size() == (40, 40)
+
+
+def test_pack_is_used_without_its_sources(display, heart, tmp_path):
+    heart.unlink()
+    assert Assets(tmp_path / "assets.pack").packed_entry("heart") is not None
+
+
+def test_explosion_sheet_is_packed_and_shared(display, tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "IMAGES", {})
+    monkeypatch.setattr(assets, "SOUNDS", {})
+    monkeypatch.setattr(assets, "EXPLOSION_SIZES", (35,))
+    build(tmp_path / "assets.pack")
+
+    pack = Assets(tmp_path / "assets.pack")
+    assert pack.packed_entry("explosion_35") is not None
+    sheet, areas = pack.explosion_sheet(35)
+    assert sheet.get_size() == (35 * EXPLOSION_FRAMES, 35) and len(areas) == EXPLOSION_FRAMES
+    assert pack.explosion_sheet(35) is pack.explosion_sheet(35)
@@ -0,0 +1,97 @@
+from multiprocessing import get_context
+from pickle import dumps
+
+import pytest
+
+from leaderboard import Entry, Leaderboard, pack_entries, unpack_entries, merge, read, load_legacy_high_score, \
+    HEADER, RECORD, MAX_NAME, SIZE
+
+
+ENTRIES = [Entry(5000, 7, 1700000000.0, "ada"), Entry(3000, 5, 1700000100.5, "grace"), Entry(10, 1, 0.0, "")]
+
+
+def test_pack_unpack_round_trip():
+    assert unpack_entries(pack_entries(ENTRIES)) == ENTRIES
+    assert unpack_entries(pack_entries([])) == []
+
+
+def test_long_names_are_cut_on_a_character():
+    name = "é" * MAX_NAME   # Two bytes each in UTF-8
+
+    entry, = unpack_entries(pack_entries([Entry(1, 1, 0.0, name)]))
+    assert entry.player == "é" * (MAX_NAME // 2)
+
+
+def test_corrupted_entries_are_rejected():
+    data = bytearray(pack_entries(ENTRIES))
+    data[HEADER.size + RECORD.size - 1] ^= 0xFF
+
+    with pytest.raises(ValueError, match="corrupted"):
+        unpack_entries(bytes(data))
+
+
+def test_other_files_are_rejected():
+    with pytest.raises(ValueError, match="not a version"):
+        unpack_entries(b"MTRP" + pack_entries(ENTRIES)[4:])
+
+
+def test_damaged_file_reads_as_empty(tmp_path):
+    path = tmp_path / "meteorites.leaderboard"
+    path.write_bytes(pack_entries(ENTRIES)[:-3])
+    assert read(path) == []
+    assert read(tmp_path / "missing") == []
+
+
+def test_merge_orders_by_score_then_date_and_drops_duplicates():
+    early, late = Entry(3000, 4, 1.0, "early"), Entry(3000, 4, 2.0, "late")
+
+    merged = merge(ENTRIES, [late, early, ENTRIES[0]])
+    assert merged == [ENTRIES[0], early, late, ENTRIES[1], ENTRIES[2]]
+
+
+def test_merge_keeps_the_best():
+    entries = [Entry(score, 1, float(score), "") for score in range(1, 30)]
+
+    merged = merge(entries[:15], entries[15:])
+    assert [entry.score for entry in merged] == list(range(29, 29 - SIZE, -1))
+
+
+def test_legacy_high_score_is_loaded_without_unpickling_objects(tmp_path):
+    (tmp_path / "score.save").write_bytes(dumps(4200))
+    assert load_legacy_high_score(tmp_path / "score.save") == 4200
+
+    (tmp_path / "evil.save").write_bytes(dumps(Entry(1, 1, 0.0, "")))
+    assert load_legacy_high_score(tmp_path / "evil.save") == 0
+
+
+def test_submitted_games_are_written_on_close(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    leaderboard = Leaderboard()
+    assert leaderboard.submit(300, 2, "ada")
+    assert leaderboard.submit(700, 4, "grace")
+    assert not leaderboard.submit(0, 1, "nobody")
+    leaderboard.close()
+
+    assert leaderboard.error is None
+    assert [(entry.score, entry.player) for entry in read(tmp_path / "meteorites.leaderboard")] == \
+           [(700, "grace"), (300, "ada")]
+    assert Leaderboard().high_score == 700
+
+
+def submit_games(path, scores: list):
+    leaderboard = Leaderboard(path)
+    for score in scores:
+        leaderboard.submit(score, 1, f"player {score}")
+    leaderboard.close()
+
+
+def test_concurrent_games_keep_the_best_of_all(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "meteorites.leaderboard"
+    games = [list(range(process, 60, 4)) for process in range(1, 5)]
+
+    with get_context("spawn").Pool(4) as pool:
+        pool.starmap(submit_games, [(path, scores) for scores in games])
+
+    assert [entry.score for entry in read(path)] == list(range(59, 59 - SIZE, -1))
@@ -0,0 +1,134 @@
+from math import hypot
+from random import Random
+
+import pytest
+
+from meteorite  import Meteorite, point_in_polygon, segment_crosses_polygon, segment_distance_squared
+from simulation import Simulation, Inputs, BULLET_SPEED, METEORITE_DESTROYED, TICK_ELAPSED_TIME
+
+SQUARE = [(-10, -10), (10, -10), (10, 10), (-10, 10)]
+
+# An arrow pointing up, concave at the notch between its barbs
+ARROW = [(0, -20), (15, 5), (5, 0), (5, 20), (-5, 20), (-5, 0), (-15, 5)]
+
+
+def meteorite_with_outline(outline, x=100.0, y=100.0, rotation=0.0):
+    meteorite = Meteorite((800, 800), rng=Random(1))
+    meteorite.outline            = outline
+    meteorite.bounding_radius    = max(hypot(px, py) for px, py in outline)
+    meteorite.x, meteorite.y     = x, y
+    meteorite.meteorite_rotation = rotation
+    return meteorite
+
+
+@pytest.mark.parametrize("point, inside", [
+    ((0, 0), True), ((9.9, 9.9), True), ((-9.9, 0), True),
+    ((10.1, 0), False), ((0, -10.1), False), ((30, 30), False),
+])
+def test_point_in_square(point, inside):
+    assert point_in_polygon(SQUARE, *point) == inside
+
+
+@pytest.mark.parametrize("point, inside", [
+    ((0, -10), True), ((0, 15), True), ((12, 3), True),
+    ((10, 10), False),   # Beside the shaft, below the barb
+    ((0, -25), False), ((-7, 10), False),
+])
+def test_point_in_concave_arrow(point, inside):
+    assert point_in_polygon(ARROW, *point) == inside
+
+
+@pytest.mark.parametrize("start, end, crosses", [
+    ((-20, 0), (20, 0), True),     # Through the square
+    ((-20, 0), (0, 0), True),      # Into it
+    ((-5, -5), (5, 5), False),     # Inside, crossing no edge
+    ((-20, 15), (20, 15), False),  # Passing above
+    ((-20, -20), (20, 20), True),  # Through the corners' diagonal
+])
+def test_segment_crosses_square(start, end, crosses):
+    assert segment_crosses_polygon(SQUARE, start, end) == crosses
+
+
+def test_segment_crosses_the_notch_of_the_arrow():
+    # Both ends lie outside, but the segment cuts through the barb in between
+    assert not point_in_polygon(ARROW, 20, 3) and not point_in_polygon(ARROW, 8, 10)
+    assert segment_crosses_polygon(ARROW, (20, 3), (8, -2))
+    # Under the barb, beside the shaft, nothing is touched
+    assert not segment_crosses_polygon(ARROW, (20, 12), (8, 12))
+
+
+@pytest.mark.parametrize("segment, distance_squared", [
+    ((-5, 3, 5, 3), 9),      # Closest in the middle
+    ((3, 4, 6, 8), 25),      # Closest at the start
+    ((6, 8, 3, 4), 25),      # Closest at the end
+    ((2, 0, 2, 0), 4),       # A point
+])
+def test_segment_distance_squared(segment, distance_squared):
+    assert segment_distance_squared(*segment) == pytest.approx(distance_squared)
+
+
+def test_collide_follows_the_rotation():
+    # The sprite turns counterclockwise on the screen, so the arrow's tip points left after a quarter turn
+    meteorite = meteorite_with_outline(ARROW, rotation=90)
+    assert meteorite.collide((100 - 15, 100))
+    assert not meteorite.collide((100, 100 - 15))
+
+    meteorite.meteorite_rotation = 0
+    assert meteorite.collide((100, 100 - 15))
+    assert not meteorite.collide((100 - 15, 100))
+
+
+def test_fast_bullet_doesnt_skip_a_thin_part():
+    # The path of the step crosses the shaft although neither end is on the meteorite
+    meteorite = meteorite_with_outline(ARROW)
+    assert not meteorite.collide((92, 110)) and not meteorite.collide((108, 110))
+    assert meteorite.collide_segment((92, 110), (108, 110))
+    assert not meteorite.collide_segment((92, 130), (108, 130))
+
+
+def test_outline_segment_agrees_with_collide_segment():
+    rng = Random(2)
+    for _ in range(200):
+        meteorite = Meteorite((800, 800), rng=rng)
+        meteorite.x, meteorite.y = 400.0, 400.0
+        start = (rng.uniform(330, 470), rng.uniform(330, 470))
+        end   = (start[0] + rng.uniform(-8, 8), start[1] + rng.uniform(-8, 8))
+
+        offsets = (start[0] - 400, start[1] - 400, end[0] - 400, end[1] - 400)
+        inside  = segment_distance_squared(*offsets) < meteorite.bounding_radius ** 2
+        assert meteorite.collide_segment(start, end) == \
+               (inside and meteorite.collide_outline_segment(*offsets, meteorite.meteorite_rotation))
+
+
+def test_spaceship_hull_collides_with_the_outline():
+    meteorite = meteorite_with_outline(SQUARE)
+    assert meteorite.collide_polygon([(105, 80), (115, 105), (95, 105)])      # A corner pokes in
+    assert not meteorite.collide_polygon([(125, 80), (135, 105), (115, 105)])
+
+
+@pytest.mark.parametrize("array_world", [False, True])
+def test_path_clipping_a_meteorite_in_the_next_cell_hits(array_world):
+    if array_world:
+        pytest.importorskip("numpy")
+
+    # The bullet starts right of a cell boundary that the meteorite's bounding circle ends just left of, and its
+    # path of the step reaches over the boundary into the square's right edge
+    meteorite = meteorite_with_outline(SQUARE)
+    meteorite.direction, meteorite.rotation_speed = 0, 0   # Moves straight down by half a unit per step
+
+    cell     = 2 * meteorite.bounding_radius   # The grid's cells without the bullets' reach
+    boundary = 5 * cell
+    meteorite.x, meteorite.y = boundary - 15, 100.0 - 0.5
+    start = (boundary + 0.5, 100.0)            # Ends 8 units left, 2.5 units inside the square
+
+    sim = Simulation(array_world=array_world, seed=1)
+    sim.fade_in, sim.fade_alpha = False, 0
+    if array_world:
+        sim.world.clear_meteorites()
+        sim.world.add_meteorite(meteorite)
+        sim.world.add_bullet(start, 90, BULLET_SPEED)
+    else:
+        sim.meteorites = [meteorite]
+        sim.bullets    = [(start, 90)]
+
+    assert METEORITE_DESTROYED in sim.step(Inputs(), TICK_ELAPSED_TIME)
@@ -0,0 +1,79 @@
+from random import Random
+
+import pytest
+
+from replay     import Replay, HEADER, pack_inputs, INPUTS
+from simulation import Simulation, Inputs, TICK_ELAPSED_TIME, GAME_OVER, MAX_SEED
+
+
+def record_game(seed: int, array_world=False, max_ticks=6000):
+    # Play a game with random keys and record every tick, like 'main.py --record'
+    sim, replay, rng = Simulation(array_world=array_world, seed=seed), Replay(seed, array_world), Random(seed)
+    for _ in range(max_ticks):
+        inputs = Inputs(up=rng.random() < 0.3, left=rng.random() < 0.4, right=rng.random() < 0.2,
+                        shoot=rng.random() < 0.1, restart=rng.random() < 0.01)
+        replay.record(inputs)
+        if GAME_OVER in sim.step(inputs, TICK_ELAPSED_TIME):
+            break
+    return sim, replay
+
+
+def test_every_input_byte_round_trips():
+    for bits, inputs in enumerate(INPUTS):
+        assert pack_inputs(inputs) == bits
+
+
+def test_save_load_round_trip(tmp_path):
+    _, replay = record_game(seed=3, max_ticks=500)
+    replay.save(tmp_path / "game.rep")
+
+    loaded = Replay.load(tmp_path / "game.rep")
+    assert loaded.seed == 3
+    assert not loaded.array_world
+    assert loaded.ticks == replay.ticks
+
+
+def test_array_world_flag_round_trips(tmp_path):
+    Replay(MAX_SEED, array_world=True, ticks=b"\x01\x10").save(tmp_path / "game.rep")
+
+    loaded = Replay.load(tmp_path / "game.rep")
+    assert (loaded.seed, loaded.array_world, loaded.ticks) == (MAX_SEED, True, b"\x01\x10")
+
+
+@pytest.mark.parametrize("array_world", [False, True])
+def test_recorded_game_replays_to_the_same_score(tmp_path, array_world):
+    if array_world:
+        pytest.importorskip("numpy")
+
+    sim, replay = record_game(seed=11, array_world=array_world)
+    replay.save(tmp_path / "game.rep")
+
+    replayed = Replay.load(tmp_path / "game.rep").play()
+    assert sim.score > 0
+    assert (replayed.score, replayed.wave, replayed.lives_remaining, replayed.game_over) == \
+           (sim.score, sim.wave, sim.lives_remaining, sim.game_over)
+
+
+@pytest.mark.parametrize("seed", [-1, MAX_SEED + 1])
+def test_seed_out_of_range_is_rejected_up_front(seed):
+    with pytest.raises(ValueError):
+        Replay(seed)
+
+
+def test_other_files_are_rejected(tmp_path):
+    (tmp_path / "other.rep").write_bytes(b"\0" * HEADER.size)
+    with pytest.raises(ValueError, match="not a version"):
+        Replay.load(tmp_path / "other.rep")
+
+
+def test_truncated_replay_is_rejected(tmp_path):
+    _, replay = record_game(seed=5, max_ticks=300)
+    replay.save(tmp_path / "game.rep")
+
+    data = (tmp_path / "game.rep").read_bytes()
+    Replay(5, ticks=replay.ticks[:100]).save(tmp_path / "short.rep")
+    short = (tmp_path / "short.rep").read_bytes()
+    (tmp_path / "game.rep").write_bytes(data[:HEADER.size] + short[HEADER.size:])
+
+    with pytest.raises(ValueError, match="truncated"):
+        Replay.load(tmp_path / "game.rep")
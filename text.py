@@ -0,0 +1,82 @@
+from pygame.font import Font
+from pygame      import Surface, Rect
+
+from collections import OrderedDict
+
+FONT   = "lib/fonts/fr73pixel.ttf"
+DIGITS = "0123456789-"
+
+
+class TextRenderer:
+    # Loads every font and size only once and keeps the rendered strings in an LRU cache keyed on
+    # (text, color, size, font), so static text is rendered once. Numbers are drawn from a pre-rendered digit atlas
+    # per font, size and color instead, so a score that changes every frame doesn't render anything new
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.fonts       = {}              # (path, size) -> Font
+        self.atlases     = {}              # (path, size, color) -> (Surface, {digit: area})
+        self.strings     = OrderedDict()   # (text, color, size, path) -> Surface
+
+        self.hits, self.misses = 0, 0
+
+    def font(self, size: int, path=FONT):
+        font = self.fonts.get((path, size))
+        if font is None:
+            font = self.fonts[(path, size)] = Font(path, size)   # -> pygame.font.Font()
+        return font
+
+    def render(self, text: str, color: tuple, size: int, path=FONT):
+        key = (text, color, size, path)
+
+        surface = self.strings.get(key)
+        if surface is not None:
+            self.strings.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.strings[key] = self.font(size, path).render(text, True, color)
+        if len(self.strings) > self.max_entries:
+            self.strings.popitem(last=False)
+        return surface
+
+    def atlas(self, color: tuple, size: int, path=FONT):
+        # The digits are rendered as one string, the area of each digit is found from the width of the text before it
+        key = (path, size, color)
+
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            font = self.font(size, path)
+            surface, areas = font.render(DIGITS, True, color), {}
+            for i, digit in enumerate(DIGITS):
+                left = font.size(DIGITS[:i])[0]
+                areas[digit] = Rect(left, 0, font.size(DIGITS[:i + 1])[0] - left, surface.get_height())
+
+            atlas = self.atlases[key] = (surface, areas)
+        return atlas
+
+    def draw(self, surface: Surface, text: str, color: tuple, size: int, position: tuple, path=FONT):
+        # Blit the text with its top left corner at 'position' and return its rect
+        return surface.blit(self.render(text, color, size, path), position)
+
+    def draw_number(self, surface: Surface, number: int, color: tuple, size: int, position: tuple, prefix="", path=FONT):
+        # Blit an optional static prefix followed by the number from the digit atlas and return the rect of both
+        x, y = position
+        rect = Rect(x, y, 0, 0)
+
+        if prefix:
+            rect = self.draw(surface, prefix, color, size, position, path)
+            x   += rect.width
+
+        atlas, areas = self.atlas(color, size, path)
+        blits = []
+        for digit in str(number):
+            area = areas[digit]
+            blits.append((atlas, (x, y), area))
+            x += area.width
+
+        surface.blits(blits, False)   # -> pygame.Surface.blits()
+        return rect.union(Rect(position[0], y, x - position[0], atlas.get_height()))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "strings": len(self.strings), "fonts": len(self.fonts)}
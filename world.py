@@ -0,0 +1,207 @@
+from broadphase import SpatialHash
+
+try:
+    import numpy as np
+except ImportError:   # NumPy is only needed for the array backed world
+    np = None
+
+
+class EntityWorld:
+    # Struct-of-arrays store for meteorites and bullets. Every attribute lives in its own contiguous
+    # NumPy array and only the first 'meteorite_count' / 'bullet_count' rows are alive, so moving,
+    # wrapping and expiring all entities is a handful of vectorized operations per frame.
+    # The Meteorite objects are kept alongside the arrays only for their outline and sprite cache id
+    def __init__(self, dimensions: tuple, capacity=64):
+        if np is None:
+            raise ImportError("the array backed world requires NumPy")
+
+        self.width, self.height = dimensions
+
+        # Meteorites
+        self.meteorite_count   = 0
+        self.meteorites        = []   # Meteorite objects, in the same order as the array rows
+        self.m_x               = np.zeros(capacity)
+        self.m_y               = np.zeros(capacity)
+        self.m_step_x          = np.zeros(capacity)   # Movement per elapsed time unit
+        self.m_step_y          = np.zeros(capacity)
+        self.m_rotation        = np.zeros(capacity)
+        self.m_rotation_speed  = np.zeros(capacity)
+        self.m_size            = np.zeros(capacity)
+        self.m_radius          = np.zeros(capacity)   # Radius of the circle bounding the meteorite's outline
+
+        # Bullets
+        self.bullet_count = 0
+        self.b_x          = np.zeros(capacity)
+        self.b_y          = np.zeros(capacity)
+        self.b_step_x     = np.zeros(capacity)
+        self.b_step_y     = np.zeros(capacity)
+
+        self.grid = SpatialHash()
+
+    # Meteorites ----------------------------------------------------
+
+    def add_meteorite(self, meteorite):
+        if self.meteorite_count == len(self.m_x):
+            self._grow_meteorites()
+
+        i = self.meteorite_count
+        self.m_x[i], self.m_y[i]  = meteorite.x, meteorite.y
+        self.m_step_x[i]          = np.sin(np.radians(meteorite.direction)) * 0.5
+        self.m_step_y[i]          = np.cos(np.radians(meteorite.direction)) * 0.5
+        self.m_rotation[i]        = meteorite.meteorite_rotation
+        self.m_rotation_speed[i]  = meteorite.rotation_speed
+        self.m_size[i]            = meteorite.meteorite_size
+        self.m_radius[i]          = meteorite.bounding_radius
+
+        self.meteorites.append(meteorite)
+        self.meteorite_count += 1
+
+    def add_meteorites(self, meteorites):
+        for meteorite in meteorites:
+            self.add_meteorite(meteorite)
+
+    def meteorite(self, i: int):
+        # Write the array state of the meteorite back into its object, e.g. before splitting it
+        meteorite = self.meteorites[i]
+        meteorite.x, meteorite.y     = float(self.m_x[i]), float(self.m_y[i])
+        meteorite.meteorite_rotation = float(self.m_rotation[i])
+        return meteorite
+
+    def remove_meteorites(self, indices):
+        self.meteorite_count = self._compact(self.meteorite_count, indices, (
+            self.m_x, self.m_y, self.m_step_x, self.m_step_y,
+            self.m_rotation, self.m_rotation_speed, self.m_size, self.m_radius,
+        ))
+        removed = set(indices)
+        self.meteorites = [meteorite for i, meteorite in enumerate(self.meteorites) if i not in removed]
+
+    def clear_meteorites(self):
+        self.meteorite_count, self.meteorites = 0, []
+
+    def move_meteorites(self, elapsed_time: float):
+        n = self.meteorite_count
+        x, y, size = self.m_x[:n], self.m_y[:n], self.m_size[:n]
+
+        # Move and rotate the meteorites
+        x += self.m_step_x[:n] * elapsed_time
+        y += self.m_step_y[:n] * elapsed_time
+        rotation = self.m_rotation[:n]
+        rotation += self.m_rotation_speed[:n] * elapsed_time
+        rotation %= 359
+
+        # Move the meteorites that left the screen to the other side
+        half = size / 2
+        over, under = x > self.width + half, x < -size
+        x[over], x[under] = -size[over], self.width + half[under]
+        over, under = y > self.height + half, y < -size
+        y[over], y[under] = -size[over], self.height + half[under]
+
+    def meteorites_near(self, position: tuple, distance=0):
+        # Indices of the meteorites whose bounding circle comes closer than 'distance' to the given coordinates
+        n = self.meteorite_count
+        near = np.hypot(self.m_x[:n] - position[0], self.m_y[:n] - position[1]) < self.m_radius[:n] + distance
+        return np.flatnonzero(near).tolist()
+
+    # Bullets -------------------------------------------------------
+
+    def add_bullet(self, position: tuple, direction: float, speed: float):
+        if self.bullet_count == len(self.b_x):
+            self._grow_bullets()
+
+        i = self.bullet_count
+        self.b_x[i], self.b_y[i] = position
+        self.b_step_x[i]         = np.sin(np.radians(direction)) * -speed
+        self.b_step_y[i]         = np.cos(np.radians(direction)) * -speed
+        self.bullet_count += 1
+
+    def remove_bullets(self, indices):
+        self.bullet_count = self._compact(self.bullet_count, indices, (
+            self.b_x, self.b_y, self.b_step_x, self.b_step_y,
+        ))
+
+    def clear_bullets(self):
+        self.bullet_count = 0
+
+    def move_bullets(self, elapsed_time: float):
+        n = self.bullet_count
+        self.b_x[:n] += self.b_step_x[:n] * elapsed_time
+        self.b_y[:n] += self.b_step_y[:n] * elapsed_time
+
+    def expire_bullets(self):
+        # Remove the bullets that have left the screen
+        n = self.bullet_count
+        x, y = self.b_x[:n], self.b_y[:n]
+        alive = (x > 0) & (x < self.width) & (y > 0) & (y < self.height)
+        if not alive.all():
+            self.remove_bullets(np.flatnonzero(~alive))
+
+    def bullet_hits(self, elapsed_time: float):
+        # Pair every bullet with the first meteorite its path of this step touches. A meteorite can only be destroyed
+        # by one bullet, so later bullets hitting an already claimed meteorite fly on. Returns (bullets, meteorites).
+        # The grid pairs every bullet with the meteorites of its cell, the bounding circles of all the pairs are tested
+        # at once, and only the pairs inside a bounding circle are left to the outline test. The meteorites are
+        # widened in the grid by the longest path, so a path reaching into the next cell still finds what it touches
+        n, m = self.bullet_count, self.meteorite_count
+        if n == 0 or m == 0:
+            return [], []
+
+        reach = float(np.hypot(self.b_step_x[:n], self.b_step_y[:n]).max()) * elapsed_time
+        self.grid.rebuild(self.m_x[:m].tolist(), self.m_y[:m].tolist(), self.m_radius[:m].tolist(), reach)
+        pair_bullets, pair_meteorites = self.grid.pairs(self.b_x[:n].tolist(), self.b_y[:n].tolist())
+        if not pair_bullets:
+            return [], []
+        bullets, meteorites = np.array(pair_bullets), np.array(pair_meteorites)
+
+        # Closest point of the bullet's path to the meteorite's center, relative to the center
+        start_x = self.b_x[bullets] - self.m_x[meteorites]
+        start_y = self.b_y[bullets] - self.m_y[meteorites]
+        step_x  = self.b_step_x[bullets] * elapsed_time
+        step_y  = self.b_step_y[bullets] * elapsed_time
+        length_squared = step_x * step_x + step_y * step_y
+        t = np.clip(-(start_x * step_x + start_y * step_y) / np.where(length_squared == 0, 1, length_squared), 0, 1)
+        closest_x, closest_y = start_x + t * step_x, start_y + t * step_y
+        near = np.flatnonzero(closest_x * closest_x + closest_y * closest_y < self.m_radius[meteorites] ** 2)
+
+        # Only the survivors are read back from the arrays, as offsets of the bullet's path from the meteorite's center
+        bullets, meteorites = bullets[near], meteorites[near]
+        end_x     = (self.b_x[bullets] + step_x[near] - self.m_x[meteorites]).tolist()
+        end_y     = (self.b_y[bullets] + step_y[near] - self.m_y[meteorites]).tolist()
+        start_x   = start_x[near].tolist()
+        start_y   = start_y[near].tolist()
+        rotations = self.m_rotation[meteorites].tolist()
+        bullets, meteorites = bullets.tolist(), meteorites.tolist()
+
+        claimed, hit_bullets, hit_meteorites = set(), [], []
+        for pair, (bullet, meteorite) in enumerate(zip(bullets, meteorites)):
+            if meteorite in claimed or (hit_bullets and hit_bullets[-1] == bullet):
+                continue
+
+            if self.meteorites[meteorite].collide_outline_segment(
+                    start_x[pair], start_y[pair], end_x[pair], end_y[pair], rotations[pair]):
+                claimed.add(meteorite)
+                hit_bullets.append(bullet)
+                hit_meteorites.append(meteorite)
+
+        return hit_bullets, hit_meteorites
+
+    # Storage -------------------------------------------------------
+
+    @staticmethod
+    def _compact(count: int, indices, arrays):
+        keep = np.ones(count, dtype=bool)
+        keep[np.asarray(indices, dtype=int)] = False
+        kept = int(keep.sum())
+        for array in arrays:
+            array[:kept] = array[:count][keep]
+        return kept
+
+    def _grow_meteorites(self):
+        capacity = len(self.m_x) * 2
+        for name in ("m_x", "m_y", "m_step_x", "m_step_y",
+                     "m_rotation", "m_rotation_speed", "m_size", "m_radius"):
+            setattr(self, name, np.resize(getattr(self, name), capacity))
+
+    def _grow_bullets(self):
+        capacity = len(self.b_x) * 2
+        for name in ("b_x", "b_y", "b_step_x", "b_step_y"):
+            setattr(self, name, np.resize(getattr(self, name), capacity))